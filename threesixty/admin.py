@@ -13,3 +13,9 @@ class SurveyAdmin(admin.ModelAdmin):
 
 
 admin.site.register(models.Question)
+
+
+@admin.register(models.EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ["subject", "recipient_list", "created", "sent", "attempts"]
+    list_filter = ["sent"]
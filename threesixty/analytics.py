@@ -0,0 +1,124 @@
+"""
+Normalization of survey results across employees.
+
+Yes-no surveys are vulnerable to suggestibility, some statements are
+simply agreed to more often than others. Comparing an employee's score
+of an attribute to the scores of all other employees eliminates this
+bias. The score matrix (surveys × attributes) of all completed surveys,
+archived ones included, is loaded in one query and kept per worker for
+``SCORE_MATRIX_TTL`` seconds. Normalized scores of a survey are z-scores: the number of
+standard deviations a score is above or below the mean of the attribute.
+Self assessments are not taken into account.
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+
+from . import models, routers
+
+__all__ = ("ScoreMatrix", "get_score_matrix", "get_normalized_scores", "clear")
+
+
+def get_score_counts(answers):
+    """Return score sums and answer counts per survey and attribute."""
+    return (
+        answers.exclude(participant__relation="self")
+        .exclude(decision=None)
+        .values_list("survey_id", "question__attribute")
+        .annotate(
+            score_sum=Count("pk", filter=Q(decision=F("question__connotation"))),
+            answer_count=Count("pk"),
+        )
+        .order_by()
+    )
+
+
+class ScoreMatrix:
+    def __init__(self, rows):
+        rows = list(rows)
+        survey_pks = np.array([row[0] for row in rows], dtype=np.int64)
+        attributes = np.array([row[1] for row in rows], dtype=str)
+        self.survey_pks, survey_index = np.unique(survey_pks, return_inverse=True)
+        self.attributes, attribute_index = np.unique(attributes, return_inverse=True)
+        sums = np.zeros((len(self.survey_pks), len(self.attributes)))
+        counts = np.zeros_like(sums)
+        sums[survey_index, attribute_index] = [row[2] for row in rows]
+        counts[survey_index, attribute_index] = [row[3] for row in rows]
+        with np.errstate(invalid="ignore"):
+            # NaN where a survey has no answers for an attribute
+            self.scores = sums / counts
+        self.mean = np.nanmean(self.scores, axis=0)
+        self.std = np.nanstd(self.scores, axis=0)
+        self.normalized = self.normalize(self.scores)
+        self.rows = {pk: i for i, pk in enumerate(self.survey_pks.tolist())}
+
+    @classmethod
+    def load(cls):
+        answers = models.Answer.objects.filter(
+            survey__is_complete=True, survey__archived_at=None
+        )
+        archived = (
+            models.ScoreSummary.objects.exclude(relation="self")
+            .filter(answer_count__gt=0)
+            .values_list("survey_id", "attribute")
+            .annotate(Sum("score_sum"), Sum("answer_count"))
+            .order_by()
+        )
+        with routers.analytics():
+            return cls(get_score_counts(answers).union(archived, all=True))
+
+    def normalize(self, scores):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            normalized = (scores - self.mean) / self.std
+        # all employees have the same score
+        normalized[..., self.std == 0] = 0
+        return np.where(np.isnan(scores), np.nan, normalized)
+
+    def get_normalized(self, survey_pk):
+        """Return the normalized scores of a survey by attribute."""
+        try:
+            normalized = self.normalized[self.rows[survey_pk]]
+        except KeyError:
+            # not part of the matrix, e.g. a survey that is not complete yet
+            scores = np.full(len(self.attributes), np.nan)
+            index = {attribute: i for i, attribute in enumerate(self.attributes)}
+            answers = models.Answer.objects.filter(survey_id=survey_pk)
+            for _, attribute, score_sum, answer_count in get_score_counts(answers):
+                if attribute in index:
+                    scores[index[attribute]] = score_sum / answer_count
+            normalized = self.normalize(scores)
+        return {
+            attribute: None if np.isnan(value) else float(value)
+            for attribute, value in zip(self.attributes.tolist(), normalized)
+        }
+
+
+_lock = threading.Lock()
+_matrix = None
+_loaded = 0.0
+
+
+def get_score_matrix():
+    """Return the score matrix of all completed surveys."""
+    global _matrix, _loaded
+    with _lock:
+        now = time.monotonic()
+        if _matrix is None or now - _loaded >= settings.SCORE_MATRIX_TTL:
+            _matrix = ScoreMatrix.load()
+            _loaded = now
+        return _matrix
+
+
+def get_normalized_scores(survey):
+    return get_score_matrix().get_normalized(survey.pk)
+
+
+def clear():
+    """Drop the score matrix of this process."""
+    global _matrix
+    with _lock:
+        _matrix = None
@@ -0,0 +1,75 @@
+"""
+Archival of completed surveys.
+
+A completed survey only shows its results, yet its answers stay in the
+answer table that every hot query reads. Archiving stores the score sums
+and answer counts per relation and attribute as :class:`.ScoreSummary`
+rows together with the chart snapshot, and then deletes the raw answers.
+Results, benchmark and score matrix read the summaries of archived
+surveys, their numbers do not change.
+
+The answers are deleted in batches without signals. They stay part of
+the benchmark through the summaries, the progress of the participants
+is kept as well.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import models, results
+
+__all__ = ("get_archivable", "archive_survey", "delete_answers")
+
+
+def get_archivable(age):
+    """Return the surveys completed longer than ``age`` ago."""
+    return models.Survey.objects.filter(
+        is_complete=True, archived_at=None, completed_at__lte=timezone.now() - age
+    )
+
+
+def archive_survey(survey, batch_size=5000):
+    """Replace the answers of a survey by summaries, return the deleted count."""
+    with transaction.atomic():
+        survey = models.Survey.objects.select_for_update().get(pk=survey.pk)
+        if not survey.is_complete:
+            raise ValueError("Survey %d is not complete." % survey.pk)
+        if survey.archived_at is None:
+            models.ScoreSummary.objects.bulk_create(
+                models.ScoreSummary(
+                    survey=survey,
+                    relation=relation,
+                    attribute=attribute,
+                    score_sum=score_sum,
+                    answer_count=answer_count,
+                )
+                for relation, attribute, score_sum, answer_count in (
+                    results.get_score_counts(survey.pk)
+                )
+            )
+            if not models.ResultSnapshot.objects.filter(survey=survey).exists():
+                data = results.get_results(survey.pk)
+                data["benchmark"] = results.get_benchmark()
+                models.ResultSnapshot.objects.create(
+                    survey=survey, data=results.to_chart_js(data)
+                )
+            survey.archived_at = timezone.now()
+            survey.save(update_fields=["archived_at"])
+    # from here on the results are read from the summaries
+    return delete_answers(survey, batch_size)
+
+
+def delete_answers(survey, batch_size=5000):
+    """Delete the answers of an archived survey in batches, return the count."""
+    if survey.archived_at is None:
+        raise ValueError("Survey %d is not archived." % survey.pk)
+    answers = models.Answer.objects.filter(survey=survey).order_by()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(answers.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            # a raw delete skips the signals that would remove the answers
+            # from the benchmark and the progress of the participants
+            deleted += models.Answer.objects.filter(pk__in=pks)._raw_delete(answers.db)
@@ -0,0 +1,18 @@
+"""
+ASGI config for threesixty project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "threesixty.settings")
+# persistent connections leak, the async ORM runs in changing threads
+os.environ.setdefault("CONN_MAX_AGE", "0")
+
+application = get_asgi_application()
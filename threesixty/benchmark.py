@@ -0,0 +1,218 @@
+"""
+Benchmark the hot paths of surveys against synthetic data.
+
+Each scenario requests an endpoint repeatedly with the test client and records
+the latency and number of queries of every request. Results can be stored as a
+baseline and later runs are compared against it to catch regressions.
+"""
+
+import itertools
+import json
+import math
+import random
+import time
+from typing import NamedTuple
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from . import catalog, models, synthetic
+
+ATTRIBUTES = (
+    "communication",
+    "reliability",
+    "teamwork",
+    "leadership",
+    "creativity",
+    "expertise",
+    "empathy",
+    "initiative",
+)
+
+
+def seed(surveys=10, participants=10, questions=50, completion=0.5, random_seed=0):
+    """Create questions and synthetic surveys, the same seed yields the same data."""
+    rng = random.Random(random_seed)
+    models.Question.objects.bulk_create(
+        models.Question(
+            text="benchmark statement %d.%d" % (random_seed, i),
+            attribute=ATTRIBUTES[i % len(ATTRIBUTES)],
+            connotation=bool(rng.getrandbits(1)),
+        )
+        for i in range(questions)
+    )
+    catalog.invalidate()
+    synthetic.generate(
+        surveys,
+        participants,
+        models.Question.objects.values_list("pk", flat=True),
+        seed=random_seed,
+        completion=completion,
+    )
+
+
+def survey_view():
+    for survey in models.Survey.objects.order_by("pk"):
+        yield "get", survey.get_employee_url(), None
+
+
+def survey_data():
+    for survey in models.Survey.objects.filter(is_complete=True).order_by("pk"):
+        token = survey.get_token(survey.employee_email)
+        yield "get", reverse("survey-data", args=(survey.pk, token)), None
+
+
+def survey_data_uncached():
+    for survey in models.Survey.objects.filter(is_complete=True).order_by("pk"):
+        models.ResultSnapshot.objects.filter(survey=survey).delete()
+        token = survey.get_token(survey.employee_email)
+        yield "get", reverse("survey-data", args=(survey.pk, token)), None
+
+
+def answer_form():
+    # participants who are done are redirected to the thanks page
+    participants = models.Participant.objects.filter(
+        survey__is_complete=False, completed_at__isnull=True
+    )
+    for participant in participants.order_by("pk"):
+        yield "get", participant.get_absolute_url(), None
+
+
+def answer_submit():
+    participants = models.Participant.objects.filter(survey__is_complete=False)
+    decks = [
+        (participant.get_absolute_url(), participant.deck[participant.deck_position :])
+        for participant in participants.order_by("pk")
+    ]
+    # answer the next question of every participant in turn
+    for questions in itertools.zip_longest(*(deck for _, deck in decks)):
+        for (url, _), question_pk in zip(decks, questions):
+            if question_pk is not None:
+                data = {"decision": 2, "question": question_pk, "undo": "false"}
+                yield "post", url, data
+
+
+#: Scenarios by name, each yields the requests to measure.
+SCENARIOS = {
+    "survey-view": survey_view,
+    "survey-data": survey_data,
+    "survey-data-uncached": survey_data_uncached,
+    "answer-form": answer_form,
+    "answer-submit": answer_submit,
+}
+#: Scenarios that are repeated until enough requests are made.
+REPEATABLE = {"survey-view", "survey-data", "survey-data-uncached", "answer-form"}
+
+
+class Result(NamedTuple):
+    name: str
+    requests: int
+    p50: float
+    p95: float
+    p99: float
+    throughput: float
+    queries: int
+
+    def as_dict(self):
+        return self._asdict()
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of the values."""
+    values = sorted(values)
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def iter_requests(name):
+    while True:
+        empty = True
+        for request in SCENARIOS[name]():
+            empty = False
+            yield request
+        if empty or name not in REPEATABLE:
+            return
+
+
+def measure(name, requests=100, warmup=5, client=None):
+    """Request a scenario and return its latencies and queries per request."""
+    client = client or Client()
+    latencies, queries = [], []
+    for i, (method, url, data) in enumerate(
+        itertools.islice(iter_requests(name), warmup + requests)
+    ):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            # secure, or SECURE_SSL_REDIRECT would time redirects instead
+            response = getattr(client, method)(url, data, secure=True)
+            latency = time.perf_counter() - start
+        if response.status_code >= 400 or (
+            method == "get" and response.status_code >= 300
+        ):
+            raise ValueError(
+                "%s %s returned %s" % (method.upper(), url, response.status_code)
+            )
+        if i >= warmup:
+            latencies.append(latency)
+            queries.append(len(context.captured_queries))
+    return latencies, queries
+
+
+def run(names=None, requests=100, warmup=5):
+    """Run the scenarios and return a result for each of them."""
+    results = []
+    with override_settings(ALLOWED_HOSTS=["testserver"]):
+        for name in names or SCENARIOS:
+            latencies, queries = measure(name, requests=requests, warmup=warmup)
+            if not latencies:
+                continue
+            results.append(
+                Result(
+                    name=name,
+                    requests=len(latencies),
+                    p50=percentile(latencies, 50) * 1000,
+                    p95=percentile(latencies, 95) * 1000,
+                    p99=percentile(latencies, 99) * 1000,
+                    throughput=len(latencies) / sum(latencies),
+                    queries=max(queries),
+                )
+            )
+    return results
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return {name: Result(**result) for name, result in json.load(f).items()}
+
+
+def save_baseline(path, results):
+    with open(path, "w") as f:
+        json.dump({result.name: result.as_dict() for result in results}, f, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance=0.5):
+    """
+    Return the regressions of the results compared to the baseline.
+
+    A scenario regresses if it needs more queries per request
+    or its 95th percentile latency exceeds the baseline by the tolerance.
+    """
+    regressions = []
+    for result in results:
+        try:
+            base = baseline[result.name]
+        except KeyError:
+            continue
+        if result.queries > base.queries:
+            regressions.append(
+                "%s: %d queries per request, baseline %d"
+                % (result.name, result.queries, base.queries)
+            )
+        if result.p95 > base.p95 * (1 + tolerance):
+            regressions.append(
+                "%s: p95 %.1fms, baseline %.1fms" % (result.name, result.p95, base.p95)
+            )
+    return regressions
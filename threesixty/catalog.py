@@ -0,0 +1,119 @@
+"""
+In-process cache of the question catalog.
+
+Questions rarely change, yet every answer page needs them. Each worker
+keeps an immutable copy of the catalog and only reloads it when the
+version stamp in the database has changed. The stamp is bumped whenever
+a question is saved, deleted or imported. To avoid touching the database
+on every request, the stamp is checked at most once per
+``QUESTION_CATALOG_TTL`` seconds.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import models
+
+__all__ = (
+    "CatalogQuestion",
+    "Catalog",
+    "get_catalog",
+    "aget_catalog",
+    "invalidate",
+    "clear",
+)
+
+
+class CatalogQuestion(NamedTuple):
+    pk: int
+    text: str
+    text_female: str
+    attribute: str
+    connotation: bool
+
+    def __str__(self):
+        return self.text
+
+    def get_display(self, survey):
+        return models.Question.get_display(self, survey)
+
+
+class Catalog:
+    def __init__(self, version, questions):
+        self.version = version
+        self.questions = MappingProxyType({q.pk: q for q in questions})
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __contains__(self, pk):
+        return pk in self.questions
+
+    def __getitem__(self, pk):
+        return self.questions[pk]
+
+    def __iter__(self):
+        return iter(self.questions.values())
+
+    @classmethod
+    def load(cls):
+        version = models.CatalogVersion.objects.current()
+        questions = models.Question.objects.order_by("pk").values_list(
+            "pk", "text", "text_female", "attribute", "connotation"
+        )
+        return cls(version, (CatalogQuestion(*row) for row in questions))
+
+
+_lock = threading.Lock()
+_catalog = None
+_checked = 0.0
+
+
+def get_catalog():
+    """Return the current question catalog, reloading it if it is outdated."""
+    global _catalog, _checked
+    with _lock:
+        now = time.monotonic()
+        if _catalog is None:
+            _catalog = Catalog.load()
+            _checked = now
+        elif now - _checked >= settings.QUESTION_CATALOG_TTL:
+            if models.CatalogVersion.objects.current() != _catalog.version:
+                _catalog = Catalog.load()
+            _checked = now
+        return _catalog
+
+
+async def aget_catalog():
+    """
+    Return the current question catalog in async code.
+
+    The database is only queried, in a thread, if the catalog is outdated.
+    The cached catalog is read without the lock, which is held while another
+    thread reloads the catalog and would block the event loop.
+    """
+    catalog, checked = _catalog, _checked
+    if (
+        catalog is not None
+        and time.monotonic() - checked < settings.QUESTION_CATALOG_TTL
+    ):
+        return catalog
+    return await sync_to_async(get_catalog)()
+
+
+def invalidate():
+    """Bump the catalog version, so that all workers reload the catalog."""
+    models.CatalogVersion.objects.bump()
+    clear()
+
+
+def clear():
+    """Drop the catalog of this process."""
+    global _catalog
+    with _lock:
+        _catalog = None
@@ -0,0 +1,110 @@
+"""Streaming export of raw answers."""
+
+import csv
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+
+from . import models
+
+__all__ = (
+    "FIELDS",
+    "get_answers",
+    "iter_csv",
+    "iter_ndjson",
+    "aiter_chunks",
+    "FORMATS",
+)
+
+CHUNK_SIZE = 2000
+
+FIELDS = (
+    "survey",
+    "participant",
+    "relation",
+    "question",
+    "attribute",
+    "connotation",
+    "decision",
+    "created",
+)
+
+
+def get_answers(
+    survey=None, since=None, until=None, attribute=None, manager_email=None
+):
+    """Return the answer rows, ordered by primary key, as tuples of ``FIELDS``."""
+    answers = models.Answer.objects.order_by("pk")
+    if survey is not None:
+        # participants belong to the survey, lets the database narrow both
+        answers = answers.filter(survey_id=survey, participant__survey_id=survey)
+    if since is not None:
+        answers = answers.filter(created__date__gte=since)
+    if until is not None:
+        answers = answers.filter(created__date__lte=until)
+    if attribute:
+        answers = answers.filter(question__attribute=attribute)
+    if manager_email is not None:
+        answers = answers.filter(survey__manager_email=manager_email)
+    return answers.values_list(
+        "survey_id",
+        "participant_id",
+        "participant__relation",
+        "question_id",
+        "question__attribute",
+        "question__connotation",
+        "decision",
+        "created",
+    )
+
+
+def iter_rows(answers, chunk_size=CHUNK_SIZE):
+    # On PostgreSQL the iterator uses a server-side cursor,
+    # only one chunk of rows is held in memory at a time.
+    for row in answers.iterator(chunk_size=chunk_size):
+        *values, created = row
+        yield (*values, created.isoformat())
+
+
+class Echo:
+    """File-like object that returns what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(answers):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for row in iter_rows(answers):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(answers):
+    for row in iter_rows(answers):
+        yield json.dumps(dict(zip(FIELDS, row))) + "\n"
+
+
+async def aiter_chunks(iterator, chunk_size=CHUNK_SIZE):
+    """
+    Yield the items of a sync iterator, pulling one chunk at a time in a thread.
+
+    ASGI servers would read a sync iterator into a list before sending it.
+    The chunks are pulled in the same thread, which keeps the server-side
+    cursor of the export on its connection.
+    """
+    next_chunk = sync_to_async(lambda: list(itertools.islice(iterator, chunk_size)))
+    try:
+        while chunk := await next_chunk():
+            for item in chunk:
+                yield item
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+FORMATS = {
+    "csv": ("text/csv", iter_csv),
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+}
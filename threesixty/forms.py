@@ -1,12 +1,71 @@
 from django import forms
 
-from . import models
+from . import export, invitations, models
 
 
-class AnswerForm(forms.ModelForm):
+class AnswerForm(forms.Form):
+    """
+    Answer to a question of the catalog.
+
+    The question is validated against the given catalog instead of the
+    database, the form can be used in async views.
+    """
+
+    decision = forms.NullBooleanField(required=False)
+    question = forms.IntegerField(widget=forms.HiddenInput)
     undo = forms.BooleanField(widget=forms.HiddenInput(), required=False)
 
+    def __init__(self, *args, questions, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.questions = questions
+
+    def clean_question(self):
+        question_pk = self.cleaned_data["question"]
+        if question_pk not in self.questions:
+            raise forms.ValidationError("Select a valid question.")
+        return question_pk
+
+
+class ParticipantForm(forms.ModelForm):
     class Meta:
-        model = models.Answer
-        fields = ["decision", "question", "undo"]
-        widgets = {"question": forms.HiddenInput}
+        model = models.Participant
+        fields = ["email", "relation"]
+
+
+class BulkInviteForm(forms.Form):
+    participants = forms.CharField(
+        widget=forms.Textarea,
+        required=False,
+        help_text="One participant per line: email,relation",
+    )
+    csv_file = forms.FileField(
+        required=False,
+        help_text="CSV file with the columns email and relation, without header.",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        lines = cleaned_data.get("participants", "").splitlines()
+        csv_file = cleaned_data.get("csv_file")
+        if csv_file:
+            try:
+                lines += csv_file.read().decode("utf-8-sig").splitlines()
+            except UnicodeDecodeError:
+                raise forms.ValidationError("The CSV file must be UTF-8 encoded.")
+        participants, errors = invitations.parse_participants(lines)
+        if errors:
+            raise forms.ValidationError(errors)
+        if not participants:
+            raise forms.ValidationError("Please enter at least one participant.")
+        cleaned_data["participants"] = participants
+        return cleaned_data
+
+
+class AnswerExportForm(forms.Form):
+    format = forms.ChoiceField(
+        choices=[(f, f) for f in sorted(export.FORMATS)], required=False
+    )
+    survey = forms.IntegerField(required=False)
+    since = forms.DateField(required=False)
+    until = forms.DateField(required=False)
+    attribute = forms.CharField(required=False)
@@ -0,0 +1,94 @@
+"""Invitation of survey participants."""
+
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.template.loader import get_template
+
+from . import catalog, models
+
+__all__ = ("parse_participants", "get_invite_email", "invite_participants")
+
+
+def parse_participants(lines):
+    """
+    Parse and validate CSV lines of participants.
+
+    Each line must contain an email and a relation, e.g.
+    ``peter@mail.com,peer``. Blank lines are ignored and duplicate emails
+    are only returned once.
+    Return a list of ``(email, relation)`` tuples and a list of errors.
+    """
+    relations = dict(models.Participant.relations)
+    participants = {}
+    errors = []
+    for line_number, row in enumerate(csv.reader(lines), start=1):
+        row = [value.strip() for value in row]
+        if not any(row):
+            continue
+        if len(row) != 2:
+            errors.append("Line %d: expected email and relation." % line_number)
+            continue
+        email, relation = row
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append("Line %d: invalid email %r." % (line_number, email))
+            continue
+        if relation not in relations:
+            errors.append("Line %d: invalid relation %r." % (line_number, relation))
+            continue
+        participants.setdefault(email, relation)
+    return list(participants.items()), errors
+
+
+def get_invite_email(survey, participant, survey_url, template=None):
+    template = template or get_template("threesixty/invite_email.txt")
+    context = {
+        "employee_name": survey.employee_name,
+        "survey_url": survey_url,
+    }
+    return models.EmailOutbox(
+        subject="360-degree feedback - %s" % survey.employee_name,
+        message=template.render(context),
+        from_email=survey.manager_email,
+        recipient_list=[participant.email],
+    )
+
+
+def invite_participants(survey, participants, build_absolute_uri):
+    """
+    Create participants in bulk and queue their invitations.
+
+    Emails that have already been invited to the survey are skipped.
+    Return the created participants.
+    """
+    emails = [email for email, _ in participants]
+    existing = set(
+        survey.participant_set.filter(email__in=emails).values_list("email", flat=True)
+    )
+    question_pks = [question.pk for question in catalog.get_catalog()]
+    new_participants = []
+    for email, relation in participants:
+        if email in existing:
+            continue
+        participant = models.Participant(email=email, survey=survey, relation=relation)
+        participant.shuffle_deck(question_pks)
+        new_participants.append(participant)
+
+    template = get_template("threesixty/invite_email.txt")
+    with transaction.atomic():
+        # no ignore_conflicts: the primary keys are needed for the invite links
+        models.Participant.objects.bulk_create(new_participants)
+        models.EmailOutbox.objects.bulk_create(
+            get_invite_email(
+                survey,
+                participant,
+                build_absolute_uri(participant.get_absolute_url()),
+                template=template,
+            )
+            for participant in new_participants
+        )
+    return new_participants
@@ -0,0 +1,66 @@
+import datetime
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from threesixty import archive
+from threesixty.models import Answer, Survey
+
+
+class Command(BaseCommand):
+    """
+    Archive surveys that have been completed more than --days ago.
+
+    The score sums and answer counts per relation and attribute are kept
+    together with the chart snapshot, the raw answers are deleted in
+    batches. Surveys whose answers have not been deleted completely,
+    e.g. after an interruption, are finished first.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ARCHIVE_SURVEYS_AFTER_DAYS,
+            help="Minimum age of the completion in days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of answers deleted at once.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only show which surveys would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        unfinished = Survey.objects.exclude(archived_at=None).filter(
+            Exists(Answer.objects.filter(survey=OuterRef("pk")))
+        )
+        surveys = archive.get_archivable(datetime.timedelta(days=options["days"]))
+        count = 0
+        for survey in [*unfinished, *surveys.order_by("completed_at")]:
+            if options["dry_run"]:
+                self.stdout.write("Would archive survey %d (%s)." % (survey.pk, survey))
+            elif survey.archived_at is None:
+                deleted = archive.archive_survey(survey, options["batch_size"])
+                self.stdout.write(
+                    "Archived survey %d, deleted %d answers." % (survey.pk, deleted)
+                )
+            else:
+                deleted = archive.delete_answers(survey, options["batch_size"])
+                self.stdout.write(
+                    "Deleted %d remaining answers of survey %d." % (deleted, survey.pk)
+                )
+            count += 1
+        self.stdout.write(
+            "%s %d surveys."
+            % ("Dry run:" if options["dry_run"] else "Archived", count),
+            self.style.SUCCESS,
+        )
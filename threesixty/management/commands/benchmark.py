@@ -0,0 +1,110 @@
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from threesixty import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Measure latency, throughput and queries of the survey endpoints.
+
+    Synthetic surveys are created before the run unless --no-seed is given.
+    All changes, including the seeded data, are rolled back afterwards.
+    Results are compared to the stored baseline and the command fails on
+    regressions. Use --save-baseline to store the results as the new baseline.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument("--surveys", type=int, default=10)
+        parser.add_argument("--participants", type=int, default=10)
+        parser.add_argument("--questions", type=int, default=50)
+        parser.add_argument(
+            "--completion",
+            type=float,
+            default=0.5,
+            help="Share of participants that answered all questions.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--no-seed",
+            action="store_false",
+            dest="create_data",
+            help="Benchmark the existing data only.",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(benchmark.SCENARIOS),
+            help="Only run this scenario, may be given multiple times.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Requests per scenario."
+        )
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--baseline",
+            default=os.path.join(settings.BASE_DIR, "benchmark.json"),
+        )
+        parser.add_argument("--save-baseline", action="store_true")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed relative increase of the p95 latency.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["create_data"]:
+                benchmark.seed(
+                    surveys=options["surveys"],
+                    participants=options["participants"],
+                    questions=options["questions"],
+                    completion=options["completion"],
+                    random_seed=options["seed"],
+                )
+            try:
+                results = benchmark.run(
+                    options["scenario"],
+                    requests=options["requests"],
+                    warmup=options["warmup"],
+                )
+            except ValueError as e:
+                raise CommandError(e) from e
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            "%-22s %8s %9s %9s %9s %9s %8s"
+            % ("scenario", "requests", "p50 ms", "p95 ms", "p99 ms", "req/s", "queries")
+        )
+        for result in results:
+            self.stdout.write(
+                "%-22s %8d %9.1f %9.1f %9.1f %9.1f %8d"
+                % (
+                    result.name,
+                    result.requests,
+                    result.p50,
+                    result.p95,
+                    result.p99,
+                    result.throughput,
+                    result.queries,
+                )
+            )
+
+        if options["save_baseline"]:
+            benchmark.save_baseline(options["baseline"], results)
+            self.stdout.write("Baseline saved to %s" % options["baseline"])
+        elif os.path.exists(options["baseline"]):
+            regressions = benchmark.compare(
+                results,
+                benchmark.load_baseline(options["baseline"]),
+                tolerance=options["tolerance"],
+            )
+            if regressions:
+                raise CommandError("Regressions:\n%s" % "\n".join(regressions))
+            self.stdout.write("No regressions compared to %s" % options["baseline"])
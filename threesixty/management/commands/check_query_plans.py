@@ -0,0 +1,119 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from threesixty import export, models, results, trends
+
+
+class Command(BaseCommand):
+    """
+    Explain the hot queries against the current database.
+
+    Fails if a query reads a table with at least --min-rows rows
+    sequentially instead of using an index. The planner prefers sequential
+    scans on small tables, run this against a database of realistic size,
+    e.g. created with the seed_synthetic command.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Only report sequential scans of tables with this many rows.",
+        )
+
+    def get_queries(self, survey, participant):
+        """Return the hot queries as name, SQL and parameters."""
+        answers = participant.answer_set.order_by()
+        querysets = {
+            "answered questions": answers.values_list("question_id", flat=True),
+            "latest answer": answers.order_by("-created")[:1],
+            "survey progress": survey.participant_set.order_by("created"),
+            "pending participants": survey.participant_set.filter(
+                completed_at__isnull=True
+            ),
+            "export survey": export.get_answers(survey=survey.pk),
+            "survey results": results.get_score_counts(survey.pk),
+            "employee rounds": trends.get_rounds(survey.employee_email),
+        }
+        return [
+            (name, *queryset.query.sql_with_params())
+            for name, queryset in querysets.items()
+        ]
+
+    def explain(self, sql, params):
+        """Return the tables the query scans sequentially."""
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+                plan = cursor.fetchone()[0]
+                return set(iter_seq_scans(plan[0]["Plan"]))
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            # SQLite reports "SCAN <table>" unless it uses an index
+            return {
+                detail.split()[1]
+                for *_, detail in cursor.fetchall()
+                if detail.startswith("SCAN ") and " USING " not in detail
+            }
+
+    def get_row_counts(self):
+        tables = [
+            model._meta.db_table
+            for model in (models.Answer, models.Participant, models.Survey)
+        ]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # the planner's estimate, counting large tables is slow.
+                # reltuples is -1 until a table has been analyzed.
+                cursor.execute(
+                    "ANALYZE %s" % ", ".join(map(connection.ops.quote_name, tables))
+                )
+                cursor.execute(
+                    "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)",
+                    [tables],
+                )
+                return {table: max(int(rows), 0) for table, rows in cursor.fetchall()}
+            counts = {}
+            for table in tables:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM %s" % connection.ops.quote_name(table)
+                )
+                counts[table] = cursor.fetchone()[0]
+            return counts
+
+    def handle(self, *args, **options):
+        participant = (
+            models.Participant.objects.select_related("survey")
+            .filter(answer__isnull=False)
+            .first()
+        )
+        if participant is None:
+            raise CommandError("There are no answers to explain queries for.")
+        row_counts = self.get_row_counts()
+        failures = []
+        for name, sql, params in self.get_queries(participant.survey, participant):
+            large_scans = sorted(
+                table
+                for table in self.explain(sql, params)
+                if row_counts.get(table, 0) >= options["min_rows"]
+            )
+            if large_scans:
+                failures.append(name)
+                for table in large_scans:
+                    self.stdout.write(
+                        "%s: sequential scan on %s (%d rows)"
+                        % (name, table, row_counts[table])
+                    )
+            else:
+                self.stdout.write("%s: ok" % name)
+        if failures:
+            raise CommandError("Sequential scans in: %s" % ", ".join(failures))
+
+
+def iter_seq_scans(node):
+    if node["Node Type"] == "Seq Scan":
+        yield node["Relation Name"]
+    for child in node.get("Plans", []):
+        yield from iter_seq_scans(child)
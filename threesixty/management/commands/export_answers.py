@@ -0,0 +1,50 @@
+import datetime
+
+from django.core.management import BaseCommand
+
+from threesixty import export
+
+
+class Command(BaseCommand):
+    """
+    Export raw answers of all surveys as CSV or NDJSON.
+
+    Each row contains the survey, participant and relation,
+    the question with its attribute and connotation, the decision
+    and when the answer was given.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(export.FORMATS), default="csv")
+        parser.add_argument("--survey", type=int, help="Only export this survey.")
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            help="Only export answers given on or after this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--until",
+            type=datetime.date.fromisoformat,
+            help="Only export answers given on or before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument("--attribute", help="Only export this attribute.")
+        parser.add_argument(
+            "-o", "--output", help="Write to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options):
+        answers = export.get_answers(
+            survey=options["survey"],
+            since=options["since"],
+            until=options["until"],
+            attribute=options["attribute"],
+        )
+        _, iter_format = export.FORMATS[options["format"]]
+        if options["output"]:
+            with open(options["output"], "w", newline="") as f:
+                f.writelines(iter_format(answers))
+        else:
+            for chunk in iter_format(answers):
+                self.stdout.write(chunk, ending="")
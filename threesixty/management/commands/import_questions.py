@@ -1,9 +1,21 @@
 import csv
+import io
+import itertools
+import urllib.parse
 import urllib.request
 
 from django.core.management import BaseCommand, CommandError
+from django.db import transaction
 
-from threesixty.models import Question
+from threesixty import catalog
+from threesixty.models import (
+    Answer,
+    BenchmarkAggregate,
+    Participant,
+    Question,
+    ResultSnapshot,
+    ScoreVector,
+)
 
 
 class Command(BaseCommand):
@@ -12,30 +24,149 @@ class Command(BaseCommand):
 
     The CSV must have the following headers "statement",
     "attribute" and "connotation".
+    Questions that already exist are skipped, unless --update is given.
+    After an import, the progress of all participants is reconciled with the
+    new number of questions. Updated questions discard the stored results of
+    the surveys that answered them. Archived surveys keep their results.
     """
 
     help = __doc__.strip()
 
     def add_arguments(self, parser):
         parser.add_argument(
-            "CSV", help="URI to CSV file." " I can be both a file:// or http:// URI."
+            "CSV",
+            help="Path or URI to CSV file. It can be both a file:// or http:// URI.",
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Update attribute and connotation of existing questions.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only show what would be changed.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows processed at once.",
         )
 
     def handle(self, *args, **options):
-        csv_uri = options.get("CSV")
+        self.update = options["update"]
+        self.dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+        self.counts = dict.fromkeys(["created", "updated", "unchanged", "skipped"], 0)
+        self.updated = []
+        # duplicates are skipped across batches, a dry run has nothing stored
+        self.seen = set()
+
+        with self.open(options["CSV"]) as lines:
+            rows = csv.DictReader(lines)
+            while batch := list(itertools.islice(rows, options["batch_size"])):
+                try:
+                    questions = [
+                        Question(
+                            text=row["statement"].strip(),
+                            attribute=row["attribute"].strip(),
+                            connotation=row["connotation"] in ["1", "true", "positive"],
+                        )
+                        for row in batch
+                    ]
+                except (KeyError, AttributeError) as e:
+                    raise CommandError("CSV header do not match.") from e
+                self.import_batch(questions)
+                self.stdout.write(
+                    "Processed %d rows." % sum(self.counts.values()), self.style.NOTICE
+                )
+
+        if not self.dry_run and self.counts["created"] + self.counts["updated"]:
+            if self.counts["updated"]:
+                BenchmarkAggregate.objects.rebuild()
+                self.discard_results()
+            catalog.invalidate()
+            changed = Participant.objects.reconcile(len(catalog.get_catalog()))
+            self.stdout.write("Reconciled progress of %d participants." % len(changed))
 
+        summary = ", ".join("%d %s" % (v, k) for k, v in self.counts.items())
+        self.stdout.write(
+            ("Dry run: %s." if self.dry_run else "Imported questions: %s.") % summary,
+            self.style.SUCCESS,
+        )
+
+    def discard_results(self):
+        """Drop the results of surveys with answers to updated questions."""
+        surveys = Answer.objects.filter(question__in=self.updated).values("survey_id")
+        ResultSnapshot.objects.filter(survey__in=surveys).delete()
+        ScoreVector.objects.filter(survey__in=surveys).delete()
+
+    def open(self, csv_uri):
+        """Open local files directly, anything else through urllib."""
+        url = urllib.parse.urlparse(csv_uri)
+        if url.scheme in ("", "file"):
+            path = urllib.request.url2pathname(url.path) if url.scheme else csv_uri
+            return open(path, newline="", encoding="utf-8-sig")
         response = urllib.request.urlopen(csv_uri)  # nosec
+        return io.TextIOWrapper(response, encoding="utf-8-sig", newline="")
+
+    def import_batch(self, questions):
+        max_length = Question._meta.get_field("text").max_length
+        new = {}
+        for question in questions:
+            if not question.text or len(question.text) > max_length:
+                self.counts["skipped"] += 1
+                self.stderr.write("Skipped invalid statement: %r" % question.text)
+            elif question.text in self.seen:
+                self.counts["skipped"] += 1
+            else:
+                self.seen.add(question.text)
+                new[question.text] = question
 
-        csv_reader = csv.DictReader(chunk.decode() for chunk in response)
-        questions = (
-            Question(
-                text=row["statement"],
-                attribute=row["attribute"],
-                connotation=row["connotation"] in ["1", "true", "positive"],
+        changed = []
+        for existing in Question.objects.filter(text__in=new):
+            question = new.pop(existing.text)
+            if (existing.attribute, existing.connotation) == (
+                question.attribute,
+                question.connotation,
+            ):
+                self.counts["unchanged"] += 1
+            elif self.update:
+                self.log_change("~", existing, question)
+                existing.attribute = question.attribute
+                existing.connotation = question.connotation
+                changed.append(existing)
+                self.counts["updated"] += 1
+            else:
+                self.counts["skipped"] += 1
+        for question in new.values():
+            self.log_change("+", question)
+        self.counts["created"] += len(new)
+
+        if not self.dry_run:
+            with transaction.atomic():
+                Question.objects.bulk_create(new.values())
+                Question.objects.bulk_update(changed, ["attribute", "connotation"])
+            self.updated += changed
+
+    def log_change(self, sign, question, new_question=None):
+        if self.verbosity < 2:
+            return
+        if new_question is None:
+            self.stdout.write(
+                "%s %s (%s, %s)"
+                % (sign, question.text, question.attribute, question.connotation)
+            )
+        else:
+            self.stdout.write(
+                "%s %s (%s, %s -> %s, %s)"
+                % (
+                    sign,
+                    question.text,
+                    question.attribute,
+                    question.connotation,
+                    new_question.attribute,
+                    new_question.connotation,
+                )
             )
-            for row in csv_reader
-        )
-        try:
-            Question.objects.bulk_create(questions)
-        except KeyError as e:
-            raise CommandError("CSV header do not match.") from e
@@ -0,0 +1,45 @@
+from django.core.management import BaseCommand, CommandError
+
+from threesixty import invitations
+from threesixty.models import Survey
+
+
+class Command(BaseCommand):
+    """
+    Invite participants to a survey from a CSV file.
+
+    The CSV must have two columns, email and relation, without a header.
+    Participants that have already been invited are skipped.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument("survey", type=int, help="Survey ID.")
+        parser.add_argument("CSV", help="Path to CSV file.")
+        parser.add_argument(
+            "--base-url",
+            required=True,
+            help="Base URL of the site used in the invitation links,"
+            " e.g. https://threesixty.example.com",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            survey = Survey.objects.get(pk=options["survey"], is_complete=False)
+        except Survey.DoesNotExist as e:
+            raise CommandError("Survey does not exist or is complete.") from e
+
+        with open(options["CSV"], encoding="utf-8-sig") as f:
+            participants, errors = invitations.parse_participants(f)
+        if errors:
+            raise CommandError("\n".join(errors))
+
+        base_url = options["base_url"].rstrip("/")
+        invited = invitations.invite_participants(
+            survey, participants, lambda path: base_url + path
+        )
+        self.stdout.write(
+            "Invited %d participants, skipped %d."
+            % (len(invited), len(participants) - len(invited))
+        )
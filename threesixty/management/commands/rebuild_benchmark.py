@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from threesixty.models import BenchmarkAggregate
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the benchmark aggregates from all answers.
+
+    The aggregates are kept up to date when answers are saved or deleted.
+    A rebuild is only required if questions have been changed afterwards.
+    """
+
+    help = __doc__.strip()
+
+    def handle(self, *args, **options):
+        aggregates = BenchmarkAggregate.objects.rebuild()
+        self.stdout.write("Rebuilt benchmark for %d attributes." % len(aggregates))
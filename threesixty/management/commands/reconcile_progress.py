@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from threesixty import catalog
+from threesixty.models import Participant
+
+
+class Command(BaseCommand):
+    """
+    Recompute the answered count and completion of all participants.
+
+    The counters are kept up to date when answers are saved or deleted.
+    A reconciliation is only required if questions have been added or
+    removed, or answers have been loaded in bulk.
+    """
+
+    help = __doc__.strip()
+
+    def handle(self, *args, **options):
+        changed = Participant.objects.reconcile(len(catalog.get_catalog()))
+        self.stdout.write("Reconciled progress of %d participants." % len(changed))
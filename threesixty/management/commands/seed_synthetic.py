@@ -0,0 +1,67 @@
+from django.core.management import BaseCommand, CommandError
+
+from threesixty import catalog, synthetic
+
+
+class Command(BaseCommand):
+    """
+    Generate synthetic surveys with participants and answers.
+
+    Participants answer the questions of the current catalog. The data
+    is deterministic for a given seed and catalog. Answers are loaded
+    with COPY on PostgreSQL and bulk inserts on other databases.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument("surveys", type=int, help="Number of surveys.")
+        parser.add_argument(
+            "participants", type=int, help="Number of participants per survey."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--completion",
+            type=float,
+            default=0.8,
+            help="Share of participants that answered all questions.",
+        )
+        parser.add_argument(
+            "--complete",
+            type=float,
+            default=0.5,
+            help="Share of surveys that are complete.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100000,
+            help="Answers loaded per transaction.",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_false",
+            dest="use_copy",
+            default=None,
+            help="Use bulk inserts even on PostgreSQL.",
+        )
+
+    def handle(self, *args, **options):
+        question_pks = [question.pk for question in catalog.get_catalog()]
+        try:
+            counts = synthetic.generate(
+                options["surveys"],
+                options["participants"],
+                question_pks,
+                seed=options["seed"],
+                completion=options["completion"],
+                complete=options["complete"],
+                batch_size=options["batch_size"],
+                use_copy=options["use_copy"],
+            )
+        except ValueError as e:
+            raise CommandError(e) from e
+        self.stdout.write(
+            "Created {surveys} surveys, {participants} participants"
+            " and {answers} answers.".format(**counts)
+        )
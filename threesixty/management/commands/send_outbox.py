@@ -0,0 +1,48 @@
+import time
+
+from django.core.management import BaseCommand
+
+from threesixty.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    """
+    Send queued emails from the outbox.
+
+    Emails are sent in batches, each batch over a single connection.
+    Without --loop, the command exits once the outbox is drained.
+    """
+
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of emails sent over one connection.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll for new emails.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            emails = EmailOutbox.objects.send_pending(batch_size=options["batch_size"])
+            if emails:
+                sent = sum(email.sent is not None for email in emails)
+                self.stdout.write(
+                    "Sent %d emails, %d failed." % (sent, len(emails) - sent)
+                )
+            elif options["loop"]:
+                time.sleep(options["interval"])
+            else:
+                break
@@ -0,0 +1,289 @@
+"""
+Per-request instrumentation exposed in the Prometheus text format.
+
+The middleware records the wall time, SQL queries, SQL time and template
+render time of every request as histograms labeled by view. Requests
+that exceed ``METRICS_QUERY_THRESHOLD`` queries or ``METRICS_LATENCY_THRESHOLD``
+seconds are logged as warnings. The statistics of database connection pools
+are exposed as well. The histograms live in the memory of each worker
+process, Prometheus should scrape every worker separately.
+"""
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends import django as django_backend
+from django.template.exceptions import TemplateDoesNotExist
+
+from . import pool
+
+__all__ = (
+    "Histogram",
+    "MetricsMiddleware",
+    "DjangoTemplates",
+    "timer",
+    "render",
+    "clear",
+)
+
+logger = logging.getLogger(__name__)
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # bucket counts followed by the sum and the count per label values
+        self._values = {}
+
+    def observe(self, value, *labels):
+        with self._lock:
+            try:
+                values = self._values[labels]
+            except KeyError:
+                values = self._values[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """Yield the lines of the histogram in the Prometheus text format."""
+        yield "# HELP %s %s" % (self.name, self.documentation)
+        yield "# TYPE %s histogram" % self.name
+        with self._lock:
+            items = sorted(
+                (labels, list(values)) for labels, values in self._values.items()
+            )
+        for labels, values in items:
+            pairs = [
+                '%s="%s"' % (name, escape(value))
+                for name, value in zip(self.labelnames, labels)
+            ]
+            *buckets, total, count = values
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), buckets + [count]):
+                yield "%s_bucket{%s} %d" % (
+                    self.name,
+                    ",".join(pairs + ['le="%s"' % bound]),
+                    bucket_count,
+                )
+            yield "%s_sum{%s} %r" % (self.name, ",".join(pairs), total)
+            yield "%s_count{%s} %d" % (self.name, ",".join(pairs), count)
+
+
+def escape(value):
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "threesixty_request_duration_seconds",
+    "Wall time of requests.",
+    SECONDS,
+    ["view", "method"],
+)
+SQL_QUERIES = Histogram(
+    "threesixty_request_sql_queries", "SQL queries per request.", QUERIES, ["view"]
+)
+SQL_SECONDS = Histogram(
+    "threesixty_request_sql_seconds", "SQL time per request.", SECONDS, ["view"]
+)
+TEMPLATE_SECONDS = Histogram(
+    "threesixty_request_template_seconds",
+    "Template render time per request.",
+    SECONDS,
+    ["view"],
+)
+HISTOGRAMS = (REQUEST_SECONDS, SQL_QUERIES, SQL_SECONDS, TEMPLATE_SECONDS)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = defaultdict(float)
+        self._running = set()
+
+
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+@contextlib.contextmanager
+def timer(kind):
+    """
+    Add the time spent in the block to the current request.
+
+    Nested blocks of the same kind, like included templates, are counted once.
+    Outside of requests this does nothing.
+    """
+    stats = _request_stats.get()
+    if stats is None or kind in stats._running:
+        yield
+        return
+    stats._running.add(kind)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.seconds[kind] += time.perf_counter() - start
+        stats._running.discard(kind)
+
+
+def count_queries(execute, sql, params, many, context):
+    """
+    Count the queries of the current request, installed on every connection.
+
+    Context variables are copied into the threads of ``sync_to_async``,
+    queries of async views are counted as well.
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    stats.queries += 1
+    with timer("sql"):
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.measure(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.measure(request):
+            return await self.get_response(request)
+
+    @contextlib.contextmanager
+    def measure(self, request):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _request_stats.reset(token)
+        self.record(request, stats, time.perf_counter() - start)
+
+    def record(self, request, stats, duration):
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        REQUEST_SECONDS.observe(duration, view, request.method)
+        SQL_QUERIES.observe(stats.queries, view)
+        SQL_SECONDS.observe(stats.seconds["sql"], view)
+        TEMPLATE_SECONDS.observe(stats.seconds["template"], view)
+        if (
+            stats.queries > settings.METRICS_QUERY_THRESHOLD
+            or duration > settings.METRICS_LATENCY_THRESHOLD
+        ):
+            logger.warning(
+                "Slow request %s %s (%s): %.3fs, %d queries, %.3fs SQL",
+                request.method,
+                request.path,
+                view,
+                duration,
+                stats.queries,
+                stats.seconds["sql"],
+            )
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        with timer("template"):
+            return super().render(context=context, request=request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Django template backend that records the render time of requests."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+POOL_SAMPLES = (
+    ("threesixty_db_pool_size", "gauge", "Maximum connections of the pool.", "size"),
+    ("threesixty_db_pool_in_use", "gauge", "Connections checked out.", "in_use"),
+    ("threesixty_db_pool_idle", "gauge", "Open connections not in use.", "idle"),
+    (
+        "threesixty_db_pool_waits_total",
+        "counter",
+        "Checkouts that waited for a free connection.",
+        "waits",
+    ),
+    (
+        "threesixty_db_pool_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a free connection.",
+        "wait_seconds",
+    ),
+    (
+        "threesixty_db_pool_timeouts_total",
+        "counter",
+        "Checkouts that gave up waiting for a free connection.",
+        "timeouts",
+    ),
+    (
+        "threesixty_db_pool_discarded_total",
+        "counter",
+        "Broken connections that were closed.",
+        "discarded",
+    ),
+)
+
+
+def pool_samples():
+    """Yield the statistics of the connection pools in the Prometheus text format."""
+    pools = pool.get_pools()
+    if not pools:
+        return
+    for name, kind, documentation, attr in POOL_SAMPLES:
+        yield "# HELP %s %s" % (name, documentation)
+        yield "# TYPE %s %s" % (name, kind)
+        for connection_pool in pools:
+            yield '%s{database="%s"} %r' % (
+                name,
+                escape(connection_pool.name),
+                getattr(connection_pool, attr),
+            )
+
+
+def render():
+    """Return all histograms and pool statistics in the Prometheus text format."""
+    lines = [line for histogram in HISTOGRAMS for line in histogram.samples()]
+    lines += pool_samples()
+    return "".join("%s\n" % line for line in lines)
+
+
+def clear():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:34
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def populate_benchmark(apps, schema_editor):
+    Answer = apps.get_model("threesixty", "Answer")
+    BenchmarkAggregate = apps.get_model("threesixty", "BenchmarkAggregate")
+    rows = (
+        Answer.objects.exclude(participant__relation="self")
+        .exclude(decision=None)
+        .values("question__attribute")
+        .annotate(
+            score_sum=Count("pk", filter=Q(decision=F("question__connotation"))),
+            answer_count=Count("pk"),
+        )
+    )
+    BenchmarkAggregate.objects.bulk_create(
+        BenchmarkAggregate(
+            attribute=row["question__attribute"],
+            score_sum=row["score_sum"],
+            answer_count=row["answer_count"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0005_auto_20210302_1123"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BenchmarkAggregate",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "attribute",
+                    models.CharField(
+                        max_length=30, unique=True, verbose_name="attribute"
+                    ),
+                ),
+                ("score_sum", models.IntegerField(default=0, verbose_name="score sum")),
+                (
+                    "answer_count",
+                    models.IntegerField(default=0, verbose_name="answer count"),
+                ),
+            ],
+        ),
+        migrations.RunPython(populate_benchmark, migrations.RunPython.noop),
+    ]
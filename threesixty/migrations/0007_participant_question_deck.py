@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0006_benchmarkaggregate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="participant",
+            name="deck_position",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="deck position"
+            ),
+        ),
+        migrations.AddField(
+            model_name="participant",
+            name="question_deck",
+            field=models.BinaryField(default=bytes, verbose_name="question deck"),
+        ),
+    ]
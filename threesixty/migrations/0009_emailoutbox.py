@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0008_catalogversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailOutbox",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=255, verbose_name="subject")),
+                ("message", models.TextField(verbose_name="message")),
+                (
+                    "from_email",
+                    models.EmailField(max_length=254, verbose_name="from email"),
+                ),
+                (
+                    "recipient_list",
+                    models.JSONField(default=list, verbose_name="recipient list"),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "sent",
+                    models.DateTimeField(blank=True, null=True, verbose_name="sent"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="attempts"
+                    ),
+                ),
+                (
+                    "next_attempt",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="next attempt"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="last error")),
+            ],
+            options={
+                "verbose_name_plural": "email outbox",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("sent", None)),
+                        fields=["next_attempt"],
+                        name="threesixty_outbox_pending",
+                    )
+                ],
+            },
+        ),
+    ]
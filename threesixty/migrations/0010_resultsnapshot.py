@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0009_emailoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResultSnapshot",
+            fields=[
+                (
+                    "survey",
+                    models.OneToOneField(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="threesixty.survey",
+                    ),
+                ),
+                ("data", models.JSONField(verbose_name="data")),
+                (
+                    "updated",
+                    models.DateTimeField(auto_now=True, verbose_name="updated"),
+                ),
+            ],
+        ),
+    ]
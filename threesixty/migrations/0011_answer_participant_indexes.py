@@ -0,0 +1,125 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:03
+
+import django.db.models.deletion
+from django.contrib.postgres import operations
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(operations.AddIndexConcurrently):
+    """Build the index without blocking writes, other databases lock anyway."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+class RemoveForeignKeyIndex(migrations.AlterField):
+    """
+    Drop the index of a foreign key without touching its constraint.
+
+    AlterField would drop and re-add the constraint, which validates the
+    whole table while locking it.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        column = model._meta.get_field(self.name).column
+        index_names = schema_editor._constraint_names(
+            model,
+            [column],
+            index=True,
+            type_=models.Index.suffix,
+            exclude={index.name for index in model._meta.indexes},
+        )
+        for name in index_names:
+            if schema_editor.connection.vendor == "postgresql":
+                sql = schema_editor._delete_index_sql(model, name, concurrently=True)
+            else:
+                sql = schema_editor._delete_index_sql(model, name)
+            schema_editor.execute(sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        fields = [model._meta.get_field(self.name)]
+        if schema_editor.connection.vendor == "postgresql":
+            sql = schema_editor._create_index_sql(
+                model, fields=fields, concurrently=True
+            )
+        else:
+            sql = schema_editor._create_index_sql(model, fields=fields)
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("threesixty", "0010_resultsnapshot"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                fields=["participant", "created"], name="answer_participant_created"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                fields=["survey", "participant", "question", "decision"],
+                name="answer_survey_results",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="participant",
+            index=models.Index(
+                fields=["survey", "created"], name="participant_survey_created"
+            ),
+        ),
+        # the single column foreign key indexes are covered by the new ones
+        RemoveForeignKeyIndex(
+            model_name="answer",
+            name="participant",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="threesixty.participant",
+            ),
+        ),
+        RemoveForeignKeyIndex(
+            model_name="answer",
+            name="survey",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="threesixty.survey",
+            ),
+        ),
+        RemoveForeignKeyIndex(
+            model_name="participant",
+            name="survey",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="threesixty.survey",
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:16
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+
+def populate_progress(apps, schema_editor):
+    Answer = apps.get_model("threesixty", "Answer")
+    Participant = apps.get_model("threesixty", "Participant")
+    Question = apps.get_model("threesixty", "Question")
+    answers = (
+        Answer.objects.filter(participant=OuterRef("pk"))
+        .order_by()
+        .values("participant")
+    )
+    Participant.objects.update(
+        answered_count=Coalesce(
+            Subquery(answers.annotate(count=Count("pk")).values("count")), 0
+        )
+    )
+    Participant.objects.filter(answered_count__gte=Question.objects.count()).update(
+        completed_at=Coalesce(
+            Subquery(answers.annotate(latest=Max("created")).values("latest")), Now()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0011_answer_participant_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="participant",
+            name="answered_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="answered count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="participant",
+            name="completed_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="completed at"
+            ),
+        ),
+        migrations.RunPython(populate_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:40
+
+import re
+
+from django.db import migrations, models
+
+# a copy of threesixty.models.feminize as of this migration
+FEMININE_PRONOUNS = {"he": "she", "him": "her", "his": "her", "himself": "herself"}
+_masculine_pronoun = re.compile(
+    r"\b(?:%s)\b" % "|".join(FEMININE_PRONOUNS), re.IGNORECASE
+)
+
+
+def feminize(text):
+    def replace(match):
+        word = match.group()
+        feminine = FEMININE_PRONOUNS[word.lower()]
+        if word.isupper() and len(word) > 1:
+            return feminine.upper()
+        if word[0].isupper():
+            return feminine.capitalize()
+        return feminine
+
+    return _masculine_pronoun.sub(replace, text)
+
+
+def populate_text_female(apps, schema_editor):
+    Question = apps.get_model("threesixty", "Question")
+    questions = list(Question.objects.only("text"))
+    for question in questions:
+        question.text_female = feminize(question.text)
+    Question.objects.bulk_update(questions, ["text_female"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0012_participant_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="text_female",
+            field=models.TextField(
+                default="", editable=False, verbose_name="question (female)"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_text_female, migrations.RunPython.noop),
+    ]
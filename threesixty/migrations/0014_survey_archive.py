@@ -0,0 +1,97 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_completed_at(apps, schema_editor):
+    Answer = apps.get_model("threesixty", "Answer")
+    Survey = apps.get_model("threesixty", "Survey")
+    # the latest answer is the best guess for when a survey was completed
+    latest_answer = (
+        Answer.objects.filter(survey=OuterRef("pk"))
+        .order_by()
+        .values("survey")
+        .annotate(latest=Max("created"))
+        .values("latest")
+    )
+    Survey.objects.filter(is_complete=True).update(
+        completed_at=Coalesce(Subquery(latest_answer), "created")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0013_question_text_female"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="survey",
+            name="archived_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="The answers have been replaced by score summaries.",
+                null=True,
+                verbose_name="archived at",
+            ),
+        ),
+        migrations.AddField(
+            model_name="survey",
+            name="completed_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="completed at"
+            ),
+        ),
+        migrations.CreateModel(
+            name="ScoreSummary",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "relation",
+                    models.CharField(
+                        choices=[
+                            ("self", "self"),
+                            ("subordinate", "subordinate"),
+                            ("peer", "peer"),
+                            ("supervisor", "supervisor"),
+                        ],
+                        max_length=11,
+                        verbose_name="relation",
+                    ),
+                ),
+                (
+                    "attribute",
+                    models.CharField(max_length=30, verbose_name="attribute"),
+                ),
+                ("score_sum", models.IntegerField(default=0, verbose_name="score sum")),
+                (
+                    "answer_count",
+                    models.IntegerField(default=0, verbose_name="answer count"),
+                ),
+                (
+                    "survey",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="threesixty.survey",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("survey", "relation", "attribute")},
+            },
+        ),
+        migrations.RunPython(populate_completed_at, migrations.RunPython.noop),
+    ]
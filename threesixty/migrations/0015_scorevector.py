@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("threesixty", "0014_survey_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreVector",
+            fields=[
+                (
+                    "survey",
+                    models.OneToOneField(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="threesixty.survey",
+                    ),
+                ),
+                (
+                    "attributes",
+                    models.TextField(
+                        help_text="One per line.", verbose_name="attributes"
+                    ),
+                ),
+                ("scores", models.BinaryField(verbose_name="scores")),
+                (
+                    "updated",
+                    models.DateTimeField(auto_now=True, verbose_name="updated"),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(
+                fields=["employee_email", "completed_at"],
+                name="survey_employee_completed",
+            ),
+        ),
+    ]
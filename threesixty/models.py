@@ -1,9 +1,35 @@
-from django.core import signing
-from django.db import models
+import datetime
+import math
+import random
+import re
+import uuid
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Greatest
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-__all__ = ("Survey", "Question", "Answer", "Participant")
+from . import tokens
+
+__all__ = (
+    "Survey",
+    "Question",
+    "Answer",
+    "Participant",
+    "BenchmarkAggregate",
+    "CatalogVersion",
+    "EmailOutbox",
+    "ResultSnapshot",
+    "ScoreSummary",
+    "ScoreVector",
+)
 
 
 class Survey(models.Model):
@@ -39,13 +65,51 @@ class Survey(models.Model):
         ),
     )
     created = models.DateTimeField(_("created"), auto_now_add=True, editable=False)
+    completed_at = models.DateTimeField(
+        _("completed at"), null=True, blank=True, editable=False
+    )
+    archived_at = models.DateTimeField(
+        _("archived at"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("The answers have been replaced by score summaries."),
+    )
+
+    class Meta:
+        indexes = [
+            # the rounds of an employee, see threesixty.trends
+            models.Index(
+                fields=["employee_email", "completed_at"],
+                name="survey_employee_completed",
+            ),
+        ]
 
     def __str__(self):
         return self.employee_name
 
+    def clean(self):
+        if self.archived_at is not None and not self.is_complete:
+            raise ValidationError(
+                {"is_complete": _("Archived surveys cannot be reopened.")}
+            )
+
+    def save(self, *args, **kwargs):
+        if not self.is_complete:
+            self.completed_at = None
+        elif self.completed_at is None:
+            self.completed_at = timezone.now()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "is_complete" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "completed_at"}
+        super().save(*args, **kwargs)
+
     def get_token(self, email):
-        signer = signing.TimestampSigner()
-        return signer.sign(email)
+        if email == self.manager_email:
+            return tokens.make_token(tokens.MANAGER, self.pk)
+        if email == self.employee_email:
+            return tokens.make_token(tokens.EMPLOYEE, self.pk)
+        raise ValueError("%s is neither manager nor employee." % email)
 
     def get_manager_url(self):
         return reverse(
@@ -63,8 +127,40 @@ class Survey(models.Model):
         return self.get_manager_url()
 
 
+#: Masculine pronouns and their feminine replacement.
+FEMININE_PRONOUNS = {"he": "she", "him": "her", "his": "her", "himself": "herself"}
+_masculine_pronoun = re.compile(
+    r"\b(?:%s)\b" % "|".join(FEMININE_PRONOUNS), re.IGNORECASE
+)
+
+
+def feminize(text):
+    """Replace whole masculine pronouns in the text, keeping their case."""
+
+    def replace(match):
+        word = match.group()
+        feminine = FEMININE_PRONOUNS[word.lower()]
+        if word.isupper() and len(word) > 1:
+            return feminine.upper()
+        if word[0].isupper():
+            return feminine.capitalize()
+        return feminine
+
+    return _masculine_pronoun.sub(replace, text)
+
+
+class QuestionQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create does not call save()
+        objs = list(objs)
+        for question in objs:
+            question.update_variants()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Question(models.Model):
     text = models.CharField(_("question"), max_length=79, db_index=True, unique=True)
+    text_female = models.TextField(_("question (female)"), editable=False)
     attribute = models.CharField(_("attribute"), max_length=30, db_index=True)
     CONNOTATIONS = ((True, _("positive")), (False, _("negative")))
     connotation = models.BooleanField(
@@ -72,6 +168,8 @@ class Question(models.Model):
     )
     created = models.DateTimeField(_("created"), auto_now_add=True, editable=False)
 
+    objects = QuestionQuerySet.as_manager()
+
     class Meta:
         get_latest_by = "created"
         ordering = ("-created",)
@@ -79,34 +177,162 @@ class Question(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        self.update_variants()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "text" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "text_female"}
+        super().save(*args, **kwargs)
+
+    def update_variants(self):
+        """Precompute the statement shown to female employees."""
+        self.text_female = feminize(self.text)
+
     def get_display(self, survey):
-        if survey.employee_gender in ["male", "other"]:
-            return self.text
-        text = self.text.replace("him", "her")
-        text = text.replace("his", "her")
-        text = text.replace("himself", "herself")
-        return text
+        if survey.employee_gender == "female":
+            return self.text_female
+        return self.text
+
+
+class AnswerQuerySet(models.QuerySet):
+    def delete(self):
+        # cascades do not call this, see the pre_delete receivers in signals
+        with transaction.atomic(using=self.db):
+            BenchmarkAggregate.objects.remove_answers(self)
+            Participant.objects.remove_answers(self, Question.objects.count())
+            return super().delete()
 
 
 class Answer(models.Model):
-    survey = models.ForeignKey("Survey", on_delete=models.CASCADE)
+    # the survey and participant are the leading columns of the indexes below
+    survey = models.ForeignKey("Survey", on_delete=models.CASCADE, db_index=False)
     question = models.ForeignKey("Question", on_delete=models.CASCADE)
     decision = models.BooleanField(_("decision"), null=True)
-    participant = models.ForeignKey("Participant", on_delete=models.CASCADE)
+    participant = models.ForeignKey(
+        "Participant", on_delete=models.CASCADE, db_index=False
+    )
     created = models.DateTimeField(_("created"), auto_now_add=True, editable=False)
 
+    objects = AnswerQuerySet.as_manager()
+
     class Meta:
         get_latest_by = "created"
         ordering = ("-created",)
         unique_together = ("survey", "question", "participant")
+        indexes = [
+            # answered count and latest answer of a participant
+            models.Index(
+                fields=["participant", "created"], name="answer_participant_created"
+            ),
+            # covers the results of a survey without reading the table
+            models.Index(
+                fields=["survey", "participant", "question", "decision"],
+                name="answer_survey_results",
+            ),
+        ]
 
     def __str__(self):
         return str(_("yes") if self.decision else _("no"))
 
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self.survey.archived_at:
+                BenchmarkAggregate.objects.add_answer(self, count=-1)
+                Participant.objects.add_answers(
+                    self.participant, -1, Question.objects.count()
+                )
+            return super().delete(*args, **kwargs)
+
+
+class ParticipantManager(models.Manager):
+    def add_answers(self, participant, count, total_questions):
+        """
+        Add (or with a negative count remove) answers to the progress of a participant.
+
+        The counter is updated in the database, so concurrent answers of the
+        same participant are not lost. The participant is completed once
+        all ``total_questions`` questions are answered.
+        """
+        now = timezone.now()
+        self.filter(pk=participant.pk).update(
+            **self.get_progress_update(count, total_questions, now)
+        )
+        participant.answered_count = max(participant.answered_count + count, 0)
+        if participant.answered_count < total_questions:
+            participant.completed_at = None
+        elif participant.completed_at is None:
+            participant.completed_at = now
+
+    def get_progress_update(self, count, total_questions, now):
+        # the conditions see the values before the update
+        return {
+            # a drifted counter must not block deleting answers
+            "answered_count": Greatest(F("answered_count") + count, 0),
+            "completed_at": Case(
+                When(answered_count__lt=total_questions - count, then=None),
+                When(completed_at__isnull=True, then=Value(now)),
+                default=F("completed_at"),
+                output_field=models.DateTimeField(),
+            ),
+        }
+
+    def remove_answers(self, answers, total_questions):
+        """
+        Remove answers from the progress of their participants.
+
+        Participants of archived surveys keep their progress.
+        """
+        now = timezone.now()
+        counts = (
+            answers.filter(survey__archived_at=None)
+            .values_list("participant")
+            .annotate(Count("pk"))
+            .order_by()
+        )
+        for participant_pk, count in counts:
+            self.filter(pk=participant_pk).update(
+                **self.get_progress_update(-count, total_questions, now)
+            )
+
+    def reconcile(self, total_questions):
+        """
+        Recompute the progress of all participants from the answer table.
+
+        Completed participants get the time of their latest answer.
+        Participants of archived surveys keep their progress.
+        Return the participants that have been corrected.
+        """
+        changed = []
+        participants = (
+            self.filter(survey__archived_at=None)
+            .annotate(
+                actual_count=Count("answer"), latest_answer=Max("answer__created")
+            )
+            .order_by("pk")
+        )
+        for participant in participants.iterator(chunk_size=2000):
+            completed_at = participant.completed_at
+            if participant.actual_count < total_questions:
+                completed_at = None
+            elif completed_at is None:
+                completed_at = participant.latest_answer or timezone.now()
+            if (participant.answered_count, participant.completed_at) != (
+                participant.actual_count,
+                completed_at,
+            ):
+                participant.answered_count = participant.actual_count
+                participant.completed_at = completed_at
+                changed.append(participant)
+        self.bulk_update(changed, ["answered_count", "completed_at"], batch_size=1000)
+        return changed
+
 
 class Participant(models.Model):
     email = models.EmailField(_("email"))
-    survey = models.ForeignKey("Survey", on_delete=models.CASCADE, editable=False)
+    # covered by the participant_survey_created index
+    survey = models.ForeignKey(
+        "Survey", on_delete=models.CASCADE, editable=False, db_index=False
+    )
     relations = (
         ("self", _("self")),
         ("subordinate", "subordinate"),
@@ -114,22 +340,371 @@ class Participant(models.Model):
         ("supervisor", _("supervisor")),
     )
     relation = models.CharField(_("relation"), max_length=11, choices=relations)
+    question_deck = models.BinaryField(_("question deck"), default=bytes)
+    deck_position = models.PositiveIntegerField(
+        _("deck position"), default=0, editable=False
+    )
+    answered_count = models.PositiveIntegerField(
+        _("answered count"), default=0, editable=False
+    )
+    completed_at = models.DateTimeField(
+        _("completed at"), null=True, blank=True, editable=False
+    )
     created = models.DateTimeField(_("created"), auto_now_add=True, editable=False)
 
+    objects = ParticipantManager()
+
     class Meta:
         unique_together = (("email", "survey"),)
+        indexes = [
+            # participants of a survey in the order they were invited
+            models.Index(
+                fields=["survey", "created"], name="participant_survey_created"
+            ),
+        ]
 
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.question_deck:
+            self.shuffle_deck(Question.objects.values_list("pk", flat=True))
+        super().save(*args, **kwargs)
+
+    @property
+    def deck(self):
+        """Question primary keys in the order they are presented."""
+        return array("I", bytes(self.question_deck))
+
+    def shuffle_deck(self, question_pks):
+        question_pks = list(question_pks)
+        random.shuffle(question_pks)  # nosec
+        self.question_deck = array("I", question_pks).tobytes()
+        self.deck_position = 0
+
+    def advance_deck(self, question_pks):
+        """Move past the given questions if they are next in the deck."""
+        question_pks = set(question_pks)
+        deck = self.deck
+        position = self.deck_position
+        while position < len(deck) and deck[position] in question_pks:
+            position += 1
+        if position != self.deck_position:
+            self.deck_position = position
+            self.save(update_fields=["deck_position"])
+
+    def rewind_deck(self, question_pk):
+        """Move back to the given question if it is the previous one in the deck."""
+        deck = self.deck
+        if 0 < self.deck_position <= len(deck):
+            if deck[self.deck_position - 1] == question_pk:
+                self.deck_position -= 1
+                self.save(update_fields=["deck_position"])
+
+    def get_token(self):
+        return tokens.make_token(tokens.PARTICIPANT, self.survey_id, self.pk)
+
     def get_absolute_url(self):
-        signer = signing.TimestampSigner()
-        token = signer.sign(self.email)
+        token = self.get_token()
         return reverse(
             "survey-answer", kwargs={"survey_pk": self.survey_id, "token": token}
         )
 
     @property
     def survey_completed(self):
-        answered = self.answer_set.all().values_list("question_id", flat=True)
-        return not Question.objects.exclude(pk__in=answered).exists()
+        return self.completed_at is not None
+
+
+class BenchmarkAggregateManager(models.Manager):
+    def add_answer(self, answer, count=1):
+        """Add (or with a negative count remove) an answer to the benchmark."""
+        self.add_answers([answer], count=count)
+
+    def add_answers(self, answers, count=1):
+        scores = defaultdict(lambda: [0, 0])
+        for answer in answers:
+            if answer.decision is None or answer.participant.relation == "self":
+                continue
+            score = scores[answer.question.attribute]
+            score[0] += int(answer.decision == answer.question.connotation)
+            score[1] += 1
+        for attribute, (score_sum, answer_count) in scores.items():
+            aggregate, _ = self.get_or_create(attribute=attribute)
+            self.filter(pk=aggregate.pk).update(
+                score_sum=F("score_sum") + score_sum * count,
+                answer_count=F("answer_count") + answer_count * count,
+            )
+
+    def add_summaries(self, summaries, count=1):
+        """Add (or with a negative count remove) score summaries to the benchmark."""
+        scores = defaultdict(lambda: [0, 0])
+        for summary in summaries:
+            if summary.relation == "self":
+                continue
+            scores[summary.attribute][0] += summary.score_sum
+            scores[summary.attribute][1] += summary.answer_count
+        for attribute, (score_sum, answer_count) in scores.items():
+            if not answer_count:
+                # all questions of the attribute have been skipped
+                continue
+            aggregate, _ = self.get_or_create(attribute=attribute)
+            self.filter(pk=aggregate.pk).update(
+                score_sum=F("score_sum") + score_sum * count,
+                answer_count=F("answer_count") + answer_count * count,
+            )
+
+    def get_scores(self, answers):
+        """Return the score sum and answer count of the answers by attribute."""
+        return (
+            # answers of archived surveys may not have been deleted yet
+            answers.filter(survey__archived_at=None)
+            .exclude(participant__relation="self")
+            .exclude(decision=None)
+            .values_list("question__attribute")
+            .annotate(
+                score_sum=Count("pk", filter=Q(decision=F("question__connotation"))),
+                answer_count=Count("pk"),
+            )
+            .order_by()
+        )
+
+    def remove_answers(self, answers):
+        """Remove the answers of a queryset from the benchmark in bulk."""
+        for attribute, score_sum, answer_count in self.get_scores(answers):
+            self.filter(attribute=attribute).update(
+                score_sum=F("score_sum") - score_sum,
+                answer_count=F("answer_count") - answer_count,
+            )
+
+    def rebuild(self):
+        """Recompute all benchmark aggregates from answers and score summaries."""
+        rows = self.get_scores(Answer.objects.all())
+        archived_rows = (
+            ScoreSummary.objects.exclude(relation="self")
+            .values_list("attribute")
+            .annotate(score_sum=Sum("score_sum"), answer_count=Sum("answer_count"))
+            .order_by()
+        )
+        scores = defaultdict(lambda: [0, 0])
+        for attribute, score_sum, answer_count in [*rows, *archived_rows]:
+            scores[attribute][0] += score_sum
+            scores[attribute][1] += answer_count
+        with transaction.atomic():
+            self.all().delete()
+            return self.bulk_create(
+                self.model(
+                    attribute=attribute,
+                    score_sum=score_sum,
+                    answer_count=answer_count,
+                )
+                for attribute, (score_sum, answer_count) in scores.items()
+                if answer_count
+            )
+
+
+class BenchmarkAggregate(models.Model):
+    """
+    Running score sum and count per attribute across all surveys.
+
+    Answers of participants with the relation "self" and skipped
+    questions are not part of the benchmark.
+    """
+
+    attribute = models.CharField(_("attribute"), max_length=30, unique=True)
+    score_sum = models.IntegerField(_("score sum"), default=0)
+    answer_count = models.IntegerField(_("answer count"), default=0)
+
+    objects = BenchmarkAggregateManager()
+
+    def __str__(self):
+        return self.attribute
+
+    @property
+    def score(self):
+        return self.score_sum / self.answer_count
+
+
+class CatalogVersionManager(models.Manager):
+    def current(self):
+        return self.get_or_create(pk=1)[0].version
+
+    def bump(self):
+        version = uuid.uuid4()
+        self.update_or_create(pk=1, defaults={"version": version})
+        return version
+
+
+class CatalogVersion(models.Model):
+    """Version stamp of the question catalog, see :mod:`threesixty.catalog`."""
+
+    version = models.UUIDField(_("version"), default=uuid.uuid4)
+    updated = models.DateTimeField(_("updated"), auto_now=True)
+
+    objects = CatalogVersionManager()
+
+    def __str__(self):
+        return str(self.version)
+
+
+class EmailOutboxManager(models.Manager):
+    def send_mail(self, subject, message, from_email, recipient_list):
+        """Queue an email, same signature as :func:`django.core.mail.send_mail`."""
+        return self.create(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipient_list=list(recipient_list),
+        )
+
+    def pending(self):
+        return self.filter(
+            sent=None,
+            attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            next_attempt__lte=timezone.now(),
+        )
+
+    def send_pending(self, batch_size=100):
+        """
+        Send a batch of queued emails over a single connection.
+
+        Emails that cannot be sent are retried with an exponential backoff
+        until ``EMAIL_OUTBOX_MAX_ATTEMPTS`` is reached.
+        Return the processed emails.
+        """
+        with transaction.atomic():
+            emails = list(
+                self.pending()
+                .select_for_update(skip_locked=True)
+                .order_by("next_attempt")[:batch_size]
+            )
+            if not emails:
+                return emails
+            connection = mail.get_connection()
+            try:
+                with connection:
+                    for email in emails:
+                        try:
+                            connection.send_messages([email.get_message()])
+                        except Exception as e:
+                            email.failed(e)
+                        else:
+                            email.sent = timezone.now()
+                            email.attempts += 1
+            except Exception as e:
+                # the connection could not be opened or closed
+                for email in emails:
+                    if email.sent is None:
+                        email.failed(e)
+            self.bulk_update(emails, ["sent", "attempts", "next_attempt", "last_error"])
+        return emails
+
+
+class EmailOutbox(models.Model):
+    subject = models.CharField(_("subject"), max_length=255)
+    message = models.TextField(_("message"))
+    from_email = models.EmailField(_("from email"))
+    recipient_list = models.JSONField(_("recipient list"), default=list)
+    created = models.DateTimeField(_("created"), auto_now_add=True, editable=False)
+    sent = models.DateTimeField(_("sent"), null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    next_attempt = models.DateTimeField(_("next attempt"), default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True)
+
+    objects = EmailOutboxManager()
+
+    class Meta:
+        verbose_name_plural = _("email outbox")
+        indexes = [
+            models.Index(
+                fields=["next_attempt"],
+                condition=Q(sent=None),
+                name="threesixty_outbox_pending",
+            )
+        ]
+
+    def __str__(self):
+        return self.subject
+
+    def get_message(self):
+        return mail.EmailMessage(
+            subject=self.subject,
+            body=self.message,
+            from_email=self.from_email,
+            to=self.recipient_list,
+        )
+
+    def failed(self, error):
+        self.attempts += 1
+        self.last_error = str(error)
+        backoff = settings.EMAIL_OUTBOX_BACKOFF * 2 ** (self.attempts - 1)
+        self.next_attempt = timezone.now() + datetime.timedelta(seconds=backoff)
+
+
+class ResultSnapshot(models.Model):
+    """Chart data of a completed survey, see :class:`.views.SurveyDataView`."""
+
+    survey = models.OneToOneField(
+        "Survey", on_delete=models.CASCADE, primary_key=True, editable=False
+    )
+    data = models.JSONField(_("data"))
+    updated = models.DateTimeField(_("updated"), auto_now=True)
+
+    def __str__(self):
+        return str(self.survey)
+
+
+class ScoreSummary(models.Model):
+    """
+    Score sum and answer count per relation and attribute of an archived survey.
+
+    Archived surveys keep these summaries instead of their raw answers,
+    see :mod:`threesixty.archive`. Skipped questions are not counted.
+    """
+
+    survey = models.ForeignKey("Survey", on_delete=models.CASCADE, editable=False)
+    relation = models.CharField(
+        _("relation"), max_length=11, choices=Participant.relations
+    )
+    attribute = models.CharField(_("attribute"), max_length=30)
+    score_sum = models.IntegerField(_("score sum"), default=0)
+    answer_count = models.IntegerField(_("answer count"), default=0)
+
+    class Meta:
+        unique_together = (("survey", "relation", "attribute"),)
+
+    def __str__(self):
+        return "%s %s" % (self.relation, self.attribute)
+
+
+class ScoreVector(models.Model):
+    """
+    Total scores by attribute of a completed survey, see :mod:`threesixty.trends`.
+
+    The scores are stored as an array of doubles in the order of the
+    attributes, NaN stands for an attribute without answers.
+    """
+
+    survey = models.OneToOneField(
+        "Survey", on_delete=models.CASCADE, primary_key=True, editable=False
+    )
+    attributes = models.TextField(_("attributes"), help_text=_("One per line."))
+    scores = models.BinaryField(_("scores"))
+    updated = models.DateTimeField(_("updated"), auto_now=True)
+
+    def __str__(self):
+        return str(self.survey)
+
+    def get_scores(self):
+        """Return the scores by attribute, None if an attribute has no answers."""
+        scores = array("d", bytes(self.scores))
+        return {
+            attribute: None if math.isnan(score) else score
+            for attribute, score in zip(self.attributes.splitlines(), scores)
+        }
+
+    def set_scores(self, scores):
+        attributes = sorted(scores)
+        self.attributes = "\n".join(attributes)
+        self.scores = array(
+            "d", (math.nan if scores[a] is None else scores[a] for a in attributes)
+        ).tobytes()
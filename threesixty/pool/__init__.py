@@ -0,0 +1,169 @@
+"""
+Connection pool for the PostgreSQL database backend.
+
+If ``DATABASE_POOL_SIZE`` is set, PostgreSQL databases use the
+``threesixty.pool`` engine. Every worker process then shares up to that many
+connections per database between all of its threads, instead of keeping one
+connection per thread. A request checks out a connection on its first query
+and returns it when it finishes. If all connections are in use, it waits up
+to ``DATABASE_POOL_TIMEOUT`` seconds for one to be returned.
+
+Connections that have been idle for ``DATABASE_POOL_CHECK_SECONDS`` are
+pinged on checkout and replaced if the server has gone away. Connections
+returned within a transaction are rolled back. The pool statistics are
+exposed by :mod:`threesixty.metrics`.
+"""
+
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+__all__ = ("ConnectionPool", "get_pool", "get_pools", "close_all")
+
+DEFAULTS = {"SIZE": 10, "TIMEOUT": 10, "CHECK_AFTER": 10}
+
+
+class ConnectionPool:
+    def __init__(self, name, size, timeout, check_after):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self.check_after = check_after
+        self._lock = threading.Condition()
+        # connections with the time they were returned, the last returned last
+        self._idle = []
+        self.in_use = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def checkout(self, connect):
+        """Return an idle or a new connection, wait if all are in use."""
+        with self._lock:
+            if not self._idle and self.in_use >= self.size:
+                self.waits += 1
+                start = time.monotonic()
+                available = self._lock.wait_for(
+                    lambda: self._idle or self.in_use < self.size, self.timeout
+                )
+                self.wait_seconds += time.monotonic() - start
+                if not available:
+                    self.timeouts += 1
+                    raise psycopg2.OperationalError(
+                        "All %d connections of the %s pool are in use."
+                        % (self.size, self.name)
+                    )
+            self.in_use += 1
+            idle = self._idle.pop() if self._idle else None
+        try:
+            if idle is not None:
+                connection, returned = idle
+                if time.monotonic() - returned < self.check_after or is_usable(
+                    connection
+                ):
+                    return connection
+                self.discard(connection)
+            return connect()
+        except BaseException:
+            self.release()
+            raise
+
+    def checkin(self, connection):
+        """Return a connection to the pool, close it if it is broken."""
+        if not reset(connection):
+            self.discard(connection)
+            self.release()
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            self.in_use -= 1
+            self._lock.notify()
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+            self._lock.notify()
+
+    def discard(self, connection):
+        with self._lock:
+            self.discarded += 1
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def close(self):
+        """Close the idle connections, connections in use are not affected."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+
+
+def is_usable(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except psycopg2.Error:
+        return False
+    return True
+
+
+def reset(connection):
+    """Roll back an open transaction, return whether the connection is usable."""
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_IDLE:
+        return True
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    try:
+        connection.rollback()
+    except psycopg2.Error:
+        return False
+    return connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, options):
+    """
+    Return the pool of the database alias.
+
+    The pool is replaced if the key, e.g. the connection parameters, changes,
+    like when tests switch to the test database.
+    """
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.key != key:
+            if pool is not None:
+                pool.close()
+            options = {**DEFAULTS, **options}
+            pool = _pools[alias] = ConnectionPool(
+                alias,
+                size=options["SIZE"],
+                timeout=options["TIMEOUT"],
+                check_after=options["CHECK_AFTER"],
+            )
+            pool.key = key
+        return pool
+
+
+def get_pools():
+    with _pools_lock:
+        return sorted(_pools.values(), key=lambda pool: pool.name)
+
+
+def close_all():
+    for pool in get_pools():
+        pool.close()
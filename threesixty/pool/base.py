@@ -0,0 +1,39 @@
+import functools
+
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+from django.utils.asyncio import async_unsafe
+
+from . import close_all, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # idle connections to the test database would block dropping it
+        close_all()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that checks connections out of a pool."""
+
+    creation_class = DatabaseCreation
+    pool = None
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        # the short-lived connections to the postgres database are not pooled
+        if self.alias == NO_DB_ALIAS:
+            return super().get_new_connection(conn_params)
+        self.pool = get_pool(
+            self.alias, key=conn_params, options=self.settings_dict.get("POOL", {})
+        )
+        return self.pool.checkout(
+            functools.partial(super().get_new_connection, conn_params)
+        )
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.checkin(self.connection)
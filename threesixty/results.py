@@ -0,0 +1,119 @@
+"""
+Portable aggregation of survey results.
+
+Scores are counted per relation and attribute in a single query that runs on
+every database backend. The total across all relations except self is summed
+up from those counts, an answer scores one if the decision matches the
+connotation of the question. Skipped questions do not count. Archived surveys
+read the same counts from their score summaries.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+
+from . import models
+
+__all__ = (
+    "get_score_counts",
+    "get_summary_counts",
+    "get_results",
+    "aget_results",
+    "get_benchmark",
+    "to_chart_js",
+)
+
+COLORS = {
+    "supervisor": "rgba(255, 0, 0, 0.5)",
+    "subordinate": "rgba(255, 255, 0, 0.5)",
+    "peer": "rgba(0, 0, 255, 0.5)",
+    "self": "rgba(0, 255, 255, 0.5)",
+    "total": "rgba(255, 0, 255, 0.5)",
+    "benchmark": "rgba(0, 0, 0, 0.25)",
+}
+
+
+def get_score_counts(survey_pk):
+    """Return score sums and answer counts per relation and attribute."""
+    return (
+        models.Answer.objects.filter(
+            # participants belong to the survey, lets the database narrow both
+            survey_id=survey_pk,
+            participant__survey_id=survey_pk,
+        )
+        .values_list("participant__relation", "question__attribute")
+        .annotate(
+            # count the decision, not the primary key, to stay within the index
+            score_sum=Count("decision", filter=Q(decision=F("question__connotation"))),
+            answer_count=Count("decision"),
+        )
+        .order_by("question__attribute", "participant__relation")
+    )
+
+
+def get_summary_counts(survey_pk):
+    """Return the score sums and answer counts an archived survey has kept."""
+    return (
+        models.ScoreSummary.objects.filter(survey_id=survey_pk)
+        .values_list("relation", "attribute", "score_sum", "answer_count")
+        .order_by("attribute", "relation")
+    )
+
+
+def get_results(survey_pk, archived=False):
+    """Return the average scores of a survey by relation and attribute."""
+    if archived:
+        return summarize(get_summary_counts(survey_pk))
+    return summarize(get_score_counts(survey_pk))
+
+
+async def aget_results(survey_pk, archived=False):
+    if archived:
+        score_counts = get_summary_counts(survey_pk)
+    else:
+        score_counts = get_score_counts(survey_pk)
+    return summarize([row async for row in score_counts])
+
+
+def summarize(score_counts):
+    results = defaultdict(dict)
+    totals = defaultdict(lambda: [0, 0])
+    for relation, attribute, score_sum, answer_count in score_counts:
+        results[relation][attribute] = (
+            score_sum / answer_count if answer_count else None
+        )
+        if relation != "self":
+            totals[attribute][0] += score_sum
+            totals[attribute][1] += answer_count
+    if totals:
+        results["total"] = {
+            attribute: score_sum / answer_count if answer_count else None
+            for attribute, (score_sum, answer_count) in totals.items()
+        }
+    return results
+
+
+def get_benchmark():
+    """Return the benchmark score by attribute."""
+    aggregates = models.BenchmarkAggregate.objects.filter(answer_count__gt=0)
+    return {aggregate.attribute: aggregate.score for aggregate in aggregates}
+
+
+def to_chart_js(data, colors=COLORS):
+    """Return results and benchmark as Chart.js data, one dataset per relation."""
+    # attributes answered in this survey, the benchmark covers all surveys
+    labels = list(
+        dict.fromkeys(
+            label
+            for attr, values in data.items()
+            if attr != "benchmark"
+            for label in values
+        )
+    )
+    datasets = []
+    for attr, values in data.items():
+        dataset = [values.get(label) for label in labels]
+        datasets.append(
+            {"label": attr, "data": dataset, "backgroundColor": colors[attr]}
+        )
+    return {"labels": labels, "datasets": datasets}
@@ -0,0 +1,110 @@
+"""
+Routing of analytic reads to a read replica.
+
+If ``REPLICA_DATABASE_URL`` is set, the queries of :func:`analytics` blocks,
+like survey results, trends and exports, read from the ``replica`` database.
+All other queries and all writes use the primary database.
+
+Replicas lag behind the primary. After a client has sent a write request,
+:class:`ReplicaMiddleware` keeps its requests on the primary for
+``REPLICA_STICKY_SECONDS``, so the client reads its own writes.
+"""
+
+import contextlib
+import contextvars
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+__all__ = (
+    "REPLICA",
+    "ReplicaRouter",
+    "ReplicaMiddleware",
+    "analytics",
+    "get_read_alias",
+)
+
+REPLICA = "replica"
+STICKY_COOKIE = "use_primary"
+
+_analytics = contextvars.ContextVar("analytics", default=False)
+_sticky = contextvars.ContextVar("sticky", default=False)
+
+
+@contextlib.contextmanager
+def analytics():
+    """Read from the replica within the block, unless the request is sticky."""
+    token = _analytics.set(True)
+    try:
+        yield
+    finally:
+        _analytics.reset(token)
+
+
+def get_read_alias():
+    if _analytics.get() and not _sticky.get() and REPLICA in connections.databases:
+        return REPLICA
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return get_read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica is migrated by replication
+        return db != REPLICA
+
+
+class ReplicaMiddleware:
+    """Keep clients on the primary database for a while after they wrote."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.stick(request):
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        with self.stick(request):
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def is_write(self, request):
+        return request.method not in ("GET", "HEAD", "OPTIONS", "TRACE")
+
+    @contextlib.contextmanager
+    def stick(self, request):
+        token = _sticky.set(self.is_write(request) or STICKY_COOKIE in request.COOKIES)
+        try:
+            yield
+        finally:
+            _sticky.reset(token)
+
+    def process_response(self, request, response):
+        if self.is_write(request) and REPLICA in connections.databases:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
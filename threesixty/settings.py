@@ -36,6 +36,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "threesixty.metrics.MetricsMiddleware",
+    "threesixty.routers.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -48,7 +50,7 @@ ROOT_URLCONF = "threesixty.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "threesixty.metrics.DjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -71,8 +73,69 @@ WSGI_APPLICATION = "threesixty.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/2.0/ref/settings/#databases
 
+# The ASGI entry point defaults to 0, persistent connections are not reused
+# across the threads of async views.
 DATABASES = {
-    "default": dj_database_url.config(conn_max_age=500),
+    "default": dj_database_url.config(
+        conn_max_age=int(os.environ.get("CONN_MAX_AGE", 500))
+    ),
+}
+
+# Analytic reads go to the replica if configured, see threesixty.routers.
+if os.environ.get("REPLICA_DATABASE_URL"):
+    DATABASES["replica"] = dj_database_url.parse(
+        os.environ["REPLICA_DATABASE_URL"],
+        conn_max_age=int(os.environ.get("CONN_MAX_AGE", 500)),
+    )
+    # tests read the replica from the test database
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["threesixty.routers.ReplicaRouter"]
+
+# Share a pool of connections between the threads of each worker process,
+# see threesixty.pool. Connections are returned after each request.
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 0))
+if DATABASE_POOL_SIZE:
+    for database in DATABASES.values():
+        if database["ENGINE"] == "django.db.backends.postgresql":
+            database["ENGINE"] = "threesixty.pool"
+            database["CONN_MAX_AGE"] = 0
+            database["POOL"] = {
+                "SIZE": DATABASE_POOL_SIZE,
+                # seconds to wait for a free connection
+                "TIMEOUT": float(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+                # seconds a connection may be idle before it is pinged on checkout
+                "CHECK_AFTER": float(os.environ.get("DATABASE_POOL_CHECK_SECONDS", 10)),
+            }
+
+# Seconds a client reads from the primary after it wrote, covers the replica lag.
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+
+# Seconds a worker keeps its question catalog before checking for changes.
+QUESTION_CATALOG_TTL = int(os.environ.get("QUESTION_CATALOG_TTL", 10))
+
+# Seconds a worker keeps the score matrix used to normalize survey results.
+SCORE_MATRIX_TTL = int(os.environ.get("SCORE_MATRIX_TTL", 300))
+
+# Days after completion when archive_surveys replaces the answers of a survey.
+ARCHIVE_SURVEYS_AFTER_DAYS = int(os.environ.get("ARCHIVE_SURVEYS_AFTER_DAYS", 365))
+
+# Bearer token required to read the metrics endpoint, it is disabled if unset.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Requests with more queries or more seconds are logged as warnings.
+METRICS_QUERY_THRESHOLD = int(os.environ.get("METRICS_QUERY_THRESHOLD", 50))
+METRICS_LATENCY_THRESHOLD = float(os.environ.get("METRICS_LATENCY_THRESHOLD", 1))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "threesixty": {
+            "handlers": ["console"],
+            "level": os.environ.get("LOG_LEVEL", "INFO"),
+        },
+    },
 }
 
 CSRF_COOKIE_SECURE = True
@@ -150,3 +213,8 @@ if os.environ.get("SENDGRID_USERNAME", False) and os.environ.get(
     EMAIL_USE_TLS = True
 else:
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+# Emails are queued in the outbox and sent by `manage.py send_outbox`.
+# Failed emails are retried with an exponential backoff (in seconds).
+EMAIL_OUTBOX_BACKOFF = 60
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
@@ -0,0 +1,94 @@
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import analytics, catalog, metrics, models
+
+
+@receiver(post_save, sender=models.Answer)
+def add_answer_to_benchmark(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        models.BenchmarkAggregate.objects.add_answer(instance)
+
+
+# Answers have no delete receivers, so that cascades delete them with a single
+# query instead of loading each answer. Their totals are removed in bulk before
+# the survey, participant or question is deleted, direct deletes are handled by
+# Answer.delete and the answer queryset.
+def deleted_with(origin, model):
+    """Return whether the deletion started with instances of the model."""
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+
+@receiver(pre_delete, sender=models.Survey)
+def remove_survey_answers(sender, instance, **kwargs):
+    # the participants are deleted as well, their progress does not matter
+    models.BenchmarkAggregate.objects.remove_answers(instance.answer_set.all())
+
+
+@receiver(pre_delete, sender=models.Participant)
+def remove_participant_answers(sender, instance, origin=None, **kwargs):
+    if deleted_with(origin, models.Survey):
+        # removed with the answers of the survey
+        return
+    models.BenchmarkAggregate.objects.remove_answers(instance.answer_set.all())
+
+
+@receiver(pre_delete, sender=models.Question)
+def remove_question_answers(sender, instance, **kwargs):
+    answers = instance.answer_set.all()
+    models.BenchmarkAggregate.objects.remove_answers(answers)
+    # the question is still part of the count
+    models.Participant.objects.remove_answers(
+        answers, models.Question.objects.count() - 1
+    )
+
+
+@receiver(post_delete, sender=models.ScoreSummary)
+def remove_summary_from_benchmark(sender, instance, **kwargs):
+    # the summaries of an archived survey replace its answers
+    models.BenchmarkAggregate.objects.add_summaries([instance], count=-1)
+
+
+@receiver(post_save, sender=models.Answer)
+def add_answer_to_progress(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        models.Participant.objects.add_answers(
+            instance.participant, 1, len(catalog.get_catalog())
+        )
+
+
+@receiver(post_save, sender=models.Question)
+@receiver(post_delete, sender=models.Question)
+def invalidate_catalog(sender, raw=False, **kwargs):
+    if not raw:
+        catalog.invalidate()
+
+
+@receiver(post_save, sender=models.Survey)
+def discard_result_snapshot(sender, instance, raw=False, **kwargs):
+    # a reopened survey may receive further answers
+    if not raw and not instance.is_complete:
+        models.ResultSnapshot.objects.filter(survey=instance).delete()
+
+
+@receiver(post_save, sender=models.Survey)
+def discard_score_vector(sender, instance, raw=False, **kwargs):
+    if not raw and not instance.is_complete:
+        models.ScoreVector.objects.filter(survey=instance).delete()
+
+
+@receiver(post_save, sender=models.Survey)
+def clear_score_matrix(sender, **kwargs):
+    # the survey might have been completed or reopened
+    analytics.clear()
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    # the wrappers outlive reconnects of the same connection object
+    if metrics.count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.count_queries)
@@ -5,12 +5,15 @@ class Question {
     this.submitNo = this.submitNo.bind(this)
     this.submitYes = this.submitYes.bind(this)
     this.submitSkip = this.submitSkip.bind(this)
+    this.submit = this.submit.bind(this)
+    this.show = this.show.bind(this)
     this.reset = this.reset.bind(this)
     this.swipeStatus = this.swipeStatus.bind(this)
     this.$yes = $('.yes')
     this.select = $('#id_decision')
+    this.question = $('#id_question')
     this.undo = $('#id_undo')
-    this.undo.attr('value', 'false')
+    this.undo.val('false')
     this.select.find('option[value="1"]').removeAttr('selected')
     this.form = $('form')[0]
     this.$no = $('.no')
@@ -47,38 +50,74 @@ class Question {
 
   submitNo () {
     this.answered = true
-    this.select.find('option[value="false"]').attr('selected', 'selected').parent().trigger('change') // 3 = No
+    this.select.val('false').trigger('change') // 3 = No
     this.$yes.height(0)
     this.$skip.width(0)
     this.$undo.width(0)
-    this.$no.animate({height: '100%'}, {duration: 250, start: this.$no.height(), complete: () => this.form.submit()})
+    this.$no.animate({height: '100%'}, {duration: 250, start: this.$no.height(), complete: this.submit})
   }
 
   submitYes () {
     this.answered = true
-    this.select.find('option[value="true"]').attr('selected', 'selected').parent().trigger('change') // 2 = Yes
+    this.select.val('true').trigger('change') // 2 = Yes
     this.$no.height(0)
     this.$skip.width(0)
     this.$undo.width(0)
-    this.$yes.animate({height: '100%'}, {duration: 250, start: this.$yes.height(), complete: () => this.form.submit()})
+    this.$yes.animate({height: '100%'}, {duration: 250, start: this.$yes.height(), complete: this.submit})
   }
 
   submitSkip () {
     this.answered = true
-    this.select.find('option[value="unknown"]').attr('selected', 'selected').parent().trigger('change') // 1 = Unknown == skip
+    this.select.val('unknown').trigger('change') // 1 = Unknown == skip
     this.$no.height(0)
     this.$yes.height(0)
     this.$undo.width(0)
-    this.$skip.animate({left: '0%', width: '100%'}, {duration: 250, start: this.$skip.width(), complete: () => this.form.submit()})
+    this.$skip.animate({left: '0%', width: '100%'}, {duration: 250, start: this.$skip.width(), complete: this.submit})
   }
 
   submitUndo () {
     this.answered = true
-    this.undo.attr('value', 'true')
+    this.undo.val('true')
     this.$no.height(0)
     this.$yes.height(0)
     this.$skip.width(0)
-    this.$undo.animate({width: '100%'}, {duration: 250, start: this.$undo.width(), complete: () => this.form.submit()})
+    this.$undo.animate({width: '100%'}, {duration: 250, start: this.$undo.width(), complete: this.submit})
+  }
+
+  submit () {
+    // Store the answer and receive the next question in one request,
+    // fall back to a regular form submission if that fails.
+    if (!window.fetch) {
+      this.form.submit()
+      return
+    }
+    window.fetch(window.location.href, {
+      method: 'POST',
+      body: new window.FormData(this.form),
+      headers: {'Accept': 'application/json'},
+      credentials: 'same-origin'
+    })
+      .then(response => response.ok ? response.json() : Promise.reject(response))
+      .then(this.show)
+      .catch(() => this.form.submit())
+  }
+
+  show (data) {
+    if (data.url) {
+      window.location.href = data.url
+      return
+    }
+    $('.question h1').text(data.statement)
+    $('.answered-questions').text(data.answered_questions)
+    $('.total-questions').text(data.total_questions)
+    this.question.val(data.question)
+    this.select.val('unknown')
+    this.undo.val('false')
+    this.$yes.height(0)
+    this.$no.height(0)
+    this.$skip.css({left: '100%', width: 0})
+    this.$undo.width(0)
+    this.answered = false
   }
 
   reset () {
@@ -0,0 +1,177 @@
+"""
+Generate synthetic surveys, participants and answers for scale testing.
+
+The data only depends on the seed and the question catalog. Every survey
+draws from its own random generator, so the surveys are identical no matter
+how they are split into chunks. Answers are loaded with ``COPY`` on PostgreSQL
+and with chunked ``bulk_create`` on other databases.
+"""
+
+import io
+import random
+from array import array
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import models
+
+#: Relations of the participants besides the employee and a supervisor.
+RELATION_WEIGHTS = {"subordinate": 5, "peer": 4, "supervisor": 1}
+
+
+def get_relations(rng, count):
+    """Return the relations of a survey, starting with self and supervisor."""
+    relations = ["self", "supervisor"][:count]
+    relations += rng.choices(
+        list(RELATION_WEIGHTS),
+        weights=list(RELATION_WEIGHTS.values()),
+        k=max(count - 2, 0),
+    )
+    return relations
+
+
+def build_survey(seed, index, question_pks, participants, completion, complete):
+    """
+    Return an unsaved survey with its participants and their decisions.
+
+    A participant answers all questions with the probability ``completion``,
+    otherwise a random number of them. Exactly the ``complete`` fraction of
+    surveys is complete, evenly spread over the indexes.
+    """
+    rng = random.Random("%s-%s" % (seed, index))
+    survey = models.Survey(
+        employee_name="employee %d" % index,
+        employee_gender=rng.choice(["female", "male", "other"]),
+        employee_email="employee-%d@example.com" % index,
+        manager_email="manager-%d@example.com" % rng.randrange(max(index // 10, 1)),
+        is_complete=int((index + 1) * complete) > int(index * complete),
+        participant_can_skip=rng.random() < 0.2,
+    )
+    members = []
+    for i, relation in enumerate(get_relations(rng, participants)):
+        deck = list(question_pks)
+        rng.shuffle(deck)
+        if rng.random() < completion:
+            answered = len(deck)
+        else:
+            answered = rng.randrange(len(deck))
+        decisions = [
+            (
+                None
+                if survey.participant_can_skip and rng.random() < 0.05
+                else rng.random() < 0.65
+            )
+            for _ in range(answered)
+        ]
+        participant = models.Participant(
+            email="participant-%d@example.com" % i,
+            relation=relation,
+            question_deck=array("I", deck).tobytes(),
+            deck_position=answered,
+            answered_count=answered,
+        )
+        members.append((participant, decisions))
+    return survey, members
+
+
+def iter_answers(survey, members):
+    for participant, decisions in members:
+        for question_pk, decision in zip(participant.deck, decisions):
+            yield survey.pk, question_pk, participant.pk, decision
+
+
+def copy_answers(rows, created):
+    """Load answer rows with COPY, only available on PostgreSQL."""
+    table = models.Answer._meta.db_table
+    buffer = io.StringIO()
+    created = created.isoformat()
+    for survey_pk, question_pk, participant_pk, decision in rows:
+        decision = r"\N" if decision is None else "t" if decision else "f"
+        buffer.write(
+            "%d\t%d\t%d\t%s\t%s\n"
+            % (survey_pk, question_pk, participant_pk, decision, created)
+        )
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY %s (survey_id, question_id, participant_id, decision, created)"
+            " FROM STDIN" % connection.ops.quote_name(table),
+            buffer,
+        )
+
+
+def create_answers(rows, created, batch_size):
+    models.Answer.objects.bulk_create(
+        (
+            models.Answer(
+                survey_id=survey_pk,
+                question_id=question_pk,
+                participant_id=participant_pk,
+                decision=decision,
+                created=created,
+            )
+            for survey_pk, question_pk, participant_pk, decision in rows
+        ),
+        batch_size=batch_size,
+    )
+
+
+def generate(
+    surveys,
+    participants,
+    question_pks,
+    seed=0,
+    completion=0.8,
+    complete=0.5,
+    batch_size=100000,
+    use_copy=None,
+):
+    """
+    Create surveys with participants and answers, return the created counts.
+
+    Surveys are created in chunks of about ``batch_size`` answers,
+    each chunk is committed separately.
+    """
+    question_pks = sorted(question_pks)
+    if not question_pks:
+        raise ValueError("There are no questions to answer.")
+    if use_copy is None:
+        use_copy = connection.vendor == "postgresql"
+    created = timezone.now()
+    counts = Counter()
+    chunk_size = max(batch_size // max(participants * len(question_pks), 1), 1)
+    for start in range(0, surveys, chunk_size):
+        chunk = [
+            build_survey(seed, index, question_pks, participants, completion, complete)
+            for index in range(start, min(start + chunk_size, surveys))
+        ]
+        with transaction.atomic():
+            for survey, _ in chunk:
+                # bulk_create does not call save()
+                survey.completed_at = created if survey.is_complete else None
+            models.Survey.objects.bulk_create(survey for survey, _ in chunk)
+            for survey, members in chunk:
+                for participant, _ in members:
+                    participant.survey = survey
+                    if participant.answered_count >= len(question_pks):
+                        participant.completed_at = created
+            models.Participant.objects.bulk_create(
+                participant for _, members in chunk for participant, _ in members
+            )
+            rows = [
+                row
+                for survey, members in chunk
+                for row in iter_answers(survey, members)
+            ]
+            if use_copy:
+                copy_answers(rows, created)
+            else:
+                create_answers(rows, created, min(batch_size, 5000))
+        counts["surveys"] += len(chunk)
+        counts["participants"] += sum(len(members) for _, members in chunk)
+        counts["answers"] += len(rows)
+    # bulk loading bypasses the signals, the progress is set above
+    models.BenchmarkAggregate.objects.rebuild()
+    return counts
@@ -0,0 +1,35 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from threesixty import analytics, catalog, metrics, routers
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Do not leak in-process caches between tests."""
+    catalog.clear()
+    analytics.clear()
+    metrics.clear()
+    yield
+    catalog.clear()
+    analytics.clear()
+    metrics.clear()
+
+
+@pytest.fixture(autouse=True)
+def replica_mirror(request):
+    """
+    Read the replica through the connection of the test transaction.
+
+    The replica is a test mirror of the default database, but a separate
+    connection would not see the rows of the uncommitted test transaction.
+    """
+    if routers.REPLICA not in connections or "db" not in request.fixturenames:
+        yield
+        return
+    # after the test transaction has started and blocked other databases
+    request.getfixturevalue("db")
+    replica = connections[routers.REPLICA]
+    connections[routers.REPLICA] = connections[DEFAULT_DB_ALIAS]
+    yield
+    connections[routers.REPLICA] = replica
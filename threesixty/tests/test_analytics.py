@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from threesixty import analytics
+from threesixty.models import Answer, Participant, Question, Survey
+
+
+class TestScoreMatrix:
+    def create_survey(self, name, decisions, is_complete=True):
+        survey = Survey.objects.create(
+            employee_name=name,
+            employee_email="%s@mail.com" % name,
+            manager_email="johannes@mail.com",
+            is_complete=is_complete,
+        )
+        peer = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        me = Participant.objects.create(
+            email="%s@mail.com" % name, survey=survey, relation="self"
+        )
+        for text, decision in decisions.items():
+            question, _ = Question.objects.get_or_create(
+                text=text,
+                defaults={
+                    "attribute": text.split()[0],
+                    "connotation": not text.endswith("not"),
+                },
+            )
+            Answer.objects.create(
+                survey=survey, question=question, participant=peer, decision=decision
+            )
+            Answer.objects.create(
+                survey=survey, question=question, participant=me, decision=True
+            )
+        return survey
+
+    @pytest.fixture
+    def surveys(self, db):
+        return [
+            self.create_survey("anna", {"honest": True, "honest not": False}),
+            self.create_survey("bert", {"honest": True, "honest not": True}),
+            self.create_survey("carl", {"honest": False, "fast": True}),
+        ]
+
+    def test_matrix(self, surveys, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            matrix = analytics.get_score_matrix()
+
+        assert matrix.attributes.tolist() == ["fast", "honest"]
+        assert matrix.survey_pks.tolist() == [s.pk for s in surveys]
+        assert matrix.scores[0].tolist() == [pytest.approx(math.nan, nan_ok=True), 1]
+        assert matrix.scores[1].tolist()[1] == 0.5
+        assert matrix.mean.tolist() == [1, 0.5]
+
+    def test_normalized_scores(self, surveys, django_assert_num_queries):
+        analytics.get_score_matrix()
+
+        with django_assert_num_queries(0):
+            normalized = analytics.get_normalized_scores(surveys[0])
+
+        # honest: scores 1, 0.5 and 0 have a mean of 0.5 and a std of ~0.41
+        assert normalized["honest"] == pytest.approx(1.2247, abs=1e-4)
+        assert normalized["fast"] is None
+        # all employees have the same score
+        assert analytics.get_normalized_scores(surveys[2])["fast"] == 0
+
+    def test_incomplete_survey(self, surveys):
+        survey = self.create_survey("dora", {"honest": True}, is_complete=False)
+
+        normalized = analytics.get_normalized_scores(survey)
+
+        assert analytics.get_score_matrix().rows.keys() == {s.pk for s in surveys}
+        assert normalized["honest"] == pytest.approx(1.2247, abs=1e-4)
+
+    def test_empty(self, db):
+        assert analytics.get_normalized_scores(Survey(pk=1)) == {}
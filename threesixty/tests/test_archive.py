@@ -0,0 +1,163 @@
+import datetime
+import json
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from threesixty import analytics, archive, results
+from threesixty.models import (
+    Answer,
+    BenchmarkAggregate,
+    Participant,
+    Question,
+    ResultSnapshot,
+    ScoreSummary,
+    Survey,
+)
+
+
+@pytest.fixture
+def surveys(db):
+    for i in range(6):
+        Question.objects.create(text="question %d" % i, attribute="a%d" % (i % 3))
+    call_command("seed_synthetic", 4, 6, seed=1, complete=1, use_copy=False)
+    return list(Survey.objects.order_by("pk"))
+
+
+def get_benchmark():
+    return dict(BenchmarkAggregate.objects.values_list("attribute", "score_sum"))
+
+
+def get_data(client, survey):
+    url = reverse(
+        "survey-data",
+        kwargs={"pk": survey.pk, "token": survey.get_token(survey.manager_email)},
+    )
+    return json.loads(client.get(url).content)
+
+
+class TestArchive:
+    def test_identical_numbers(self, surveys, client):
+        survey = surveys[0]
+        data = get_data(client, survey)
+        survey_results = results.get_results(survey.pk)
+        benchmark = get_benchmark()
+        normalized = analytics.get_normalized_scores(survey)
+        progress = list(Participant.objects.values_list("answered_count", flat=True))
+
+        deleted = archive.archive_survey(survey, batch_size=7)
+
+        survey.refresh_from_db()
+        assert deleted > 0
+        assert survey.archived_at is not None
+        assert not Answer.objects.filter(survey=survey).exists()
+        assert Answer.objects.filter(survey=surveys[1]).exists()
+        assert results.get_results(survey.pk, archived=True) == survey_results
+        assert get_data(client, survey) == data
+        ResultSnapshot.objects.all().delete()
+        assert get_data(client, survey) == data
+        assert get_benchmark() == benchmark
+        BenchmarkAggregate.objects.rebuild()
+        assert get_benchmark() == benchmark
+        analytics.clear()
+        assert analytics.get_normalized_scores(survey) == normalized
+        assert Participant.objects.reconcile(6) == []
+        assert (
+            list(Participant.objects.values_list("answered_count", flat=True))
+            == progress
+        )
+
+    def test_delete_archived_survey(self, surveys):
+        for survey in surveys[1:]:
+            survey.delete()
+        archive.archive_survey(surveys[0])
+
+        surveys[0].delete()
+
+        assert not ScoreSummary.objects.exists()
+        assert set(
+            BenchmarkAggregate.objects.values_list("answer_count", flat=True)
+        ) == {0}
+
+    def test_delete_partially_archived_survey(self, surveys, monkeypatch):
+        for survey in surveys[1:]:
+            survey.delete()
+        # the deletion of the answers is interrupted
+        monkeypatch.setattr(archive, "delete_answers", lambda *args: 0)
+        archive.archive_survey(surveys[0])
+        benchmark = get_benchmark()
+        progress = list(Participant.objects.values_list("answered_count", flat=True))
+
+        Answer.objects.filter(survey=surveys[0]).delete()
+
+        assert get_benchmark() == benchmark
+        assert (
+            list(Participant.objects.values_list("answered_count", flat=True))
+            == progress
+        )
+        surveys[0].delete()
+        assert set(
+            BenchmarkAggregate.objects.values_list("score_sum", "answer_count")
+        ) == {(0, 0)}
+
+    def test_incomplete_survey(self, surveys):
+        survey = surveys[0]
+        survey.is_complete = False
+        survey.save()
+
+        with pytest.raises(ValueError, match="not complete"):
+            archive.archive_survey(survey)
+
+    def test_reopen(self, surveys):
+        survey = surveys[0]
+        archive.archive_survey(survey)
+        survey.refresh_from_db()
+        survey.is_complete = False
+
+        with pytest.raises(ValidationError):
+            survey.full_clean()
+
+    def test_completed_at(self, db):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        assert survey.completed_at is None
+        survey.is_complete = True
+        survey.save(update_fields=["is_complete"])
+        survey.refresh_from_db()
+        assert survey.completed_at is not None
+        survey.is_complete = False
+        survey.save()
+        assert survey.completed_at is None
+
+
+class TestArchiveSurveys:
+    def test_archive(self, surveys, capsys):
+        Survey.objects.filter(pk=surveys[0].pk).update(
+            completed_at=timezone.now() - datetime.timedelta(days=40)
+        )
+
+        call_command("archive_surveys", days=30, dry_run=True)
+        assert "Would archive survey %d" % surveys[0].pk in capsys.readouterr().out
+        assert not Survey.objects.exclude(archived_at=None).exists()
+
+        call_command("archive_surveys", days=30)
+
+        assert "Archived 1 surveys." in capsys.readouterr().out
+        assert list(Survey.objects.exclude(archived_at=None)) == [surveys[0]]
+        assert not Answer.objects.filter(survey=surveys[0]).exists()
+
+    def test_resume(self, surveys, capsys):
+        Survey.objects.filter(pk=surveys[0].pk).update(archived_at=timezone.now())
+
+        call_command("archive_surveys")
+
+        assert "remaining answers of survey %d" % surveys[0].pk in (
+            capsys.readouterr().out
+        )
+        assert not Answer.objects.filter(survey=surveys[0]).exists()
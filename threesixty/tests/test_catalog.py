@@ -0,0 +1,83 @@
+import threading
+
+from asgiref.sync import async_to_sync
+
+from threesixty import catalog
+from threesixty.models import CatalogVersion, Question
+
+
+class TestCatalog:
+    def create_question(self, text="how good is he?"):
+        return Question.objects.create(
+            text=text, attribute="porfessionalitaet", connotation=True
+        )
+
+    def test_get_catalog(self, db):
+        question = self.create_question()
+
+        questions = catalog.get_catalog()
+
+        assert len(questions) == 1
+        assert questions[question.pk].text == question.text
+        assert questions[question.pk].attribute == question.attribute
+        assert questions[question.pk].connotation is True
+
+    def test_cached(self, db, django_assert_num_queries):
+        self.create_question()
+        catalog.get_catalog()
+
+        with django_assert_num_queries(0):
+            assert len(catalog.get_catalog()) == 1
+
+    def test_invalidate_on_save(self, db):
+        question = self.create_question()
+        catalog.get_catalog()
+
+        question.text = "how bad is he?"
+        question.save()
+
+        assert catalog.get_catalog()[question.pk].text == "how bad is he?"
+
+    def test_invalidate_on_delete(self, db):
+        question = self.create_question()
+        catalog.get_catalog()
+
+        question.delete()
+
+        assert len(catalog.get_catalog()) == 0
+
+    def test_version_changed_by_other_worker(self, db, settings):
+        settings.QUESTION_CATALOG_TTL = 0
+        self.create_question()
+        catalog.get_catalog()
+
+        Question.objects.update(text="how bad is he?")
+        CatalogVersion.objects.bump()
+
+        assert [q.text for q in catalog.get_catalog()] == ["how bad is he?"]
+
+    def test_aget_catalog_during_reload(self, db):
+        self.create_question()
+        questions = catalog.get_catalog()
+        result = []
+
+        # another thread holds the lock while it reloads the catalog
+        with catalog._lock:
+            thread = threading.Thread(
+                target=lambda: result.append(async_to_sync(catalog.aget_catalog)())
+            )
+            thread.start()
+            thread.join(timeout=5)
+
+        assert result == [questions]
+
+    def test_aget_catalog_outdated(self, db, settings):
+        settings.QUESTION_CATALOG_TTL = 0
+        self.create_question()
+        catalog.get_catalog()
+
+        Question.objects.update(text="how bad is he?")
+        CatalogVersion.objects.bump()
+
+        questions = async_to_sync(catalog.aget_catalog)()
+        assert [q.text for q in questions] == ["how bad is he?"]
@@ -0,0 +1,412 @@
+import json
+
+import pytest
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponseRedirect
+
+from threesixty import benchmark
+from threesixty.management.commands import check_query_plans
+from threesixty.models import (
+    Answer,
+    BenchmarkAggregate,
+    EmailOutbox,
+    Participant,
+    Question,
+    ResultSnapshot,
+    ScoreVector,
+    Survey,
+)
+
+
+@pytest.fixture
+def survey(db):
+    return Survey.objects.create(
+        employee_name="sebastian",
+        employee_email="sebastian@mail.com",
+        manager_email="johannes@mail.com",
+    )
+
+
+class TestRebuildBenchmark:
+    def test_rebuild(self, db):
+        BenchmarkAggregate.objects.create(attribute="stale", answer_count=1)
+
+        call_command("rebuild_benchmark")
+
+        assert not BenchmarkAggregate.objects.exists()
+
+
+class TestReconcileProgress:
+    def test_reconcile(self, survey, capsys):
+        Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer", answered_count=3
+        )
+
+        call_command("reconcile_progress")
+
+        assert "Reconciled progress of 1 participants." in capsys.readouterr().out
+        assert Participant.objects.get().answered_count == 0
+
+
+class TestSendOutbox:
+    def test_send(self, db):
+        EmailOutbox.objects.send_mail(
+            "subject", "message", "johannes@mail.com", ["peter@mail.com"]
+        )
+
+        call_command("send_outbox", batch_size=1)
+
+        assert mail.outbox[0].recipients() == ["peter@mail.com"]
+
+
+class TestInviteParticipants:
+    def test_invite(self, survey, tmp_path):
+        csv_file = tmp_path / "participants.csv"
+        csv_file.write_text("peter@mail.com,peer\nmary@mail.com,self\n")
+
+        call_command(
+            "invite_participants",
+            survey.pk,
+            str(csv_file),
+            base_url="https://threesixty.example.com/",
+        )
+        call_command("invite_participants", survey.pk, str(csv_file), base_url="x")
+
+        assert Participant.objects.count() == 2
+        assert EmailOutbox.objects.count() == 2
+        peter = Participant.objects.get(email="peter@mail.com")
+        email = EmailOutbox.objects.get(recipient_list=["peter@mail.com"])
+        assert (
+            "https://threesixty.example.com%s" % peter.get_absolute_url().split(":")[0]
+            in email.message
+        )
+
+    def test_invalid(self, survey, tmp_path):
+        csv_file = tmp_path / "participants.csv"
+        csv_file.write_text("peter@mail.com\n")
+
+        with pytest.raises(CommandError, match="Line 1"):
+            call_command("invite_participants", survey.pk, str(csv_file), base_url="x")
+
+
+class TestExportAnswers:
+    def test_export(self, survey, tmp_path):
+        participant = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        for i, attribute in enumerate(["attribute 1", "attribute 2"]):
+            question = Question.objects.create(
+                text="Question %d" % i, attribute=attribute
+            )
+            Answer.objects.create(
+                survey=survey, question=question, participant=participant
+            )
+        output = tmp_path / "answers.ndjson"
+
+        call_command(
+            "export_answers",
+            format="ndjson",
+            attribute="attribute 2",
+            since="2000-01-01",
+            output=str(output),
+        )
+
+        lines = output.read_text().splitlines()
+        assert len(lines) == 1
+        assert '"attribute": "attribute 2"' in lines[0]
+        assert '"decision": null' in lines[0]
+
+
+class TestImportQuestions:
+    CSV = (
+        "statement,attribute,connotation\n"
+        "He is honest.,honesty,positive\n"
+        "He lies.,honesty,negative\n"
+        "He is fast.,speed,1\n"
+        "He is fast.,speed,1\n"
+    )
+
+    def write_csv(self, tmp_path, content):
+        csv_file = tmp_path / "questions.csv"
+        csv_file.write_text(content)
+        return csv_file
+
+    def test_import(self, db, tmp_path):
+        csv_file = self.write_csv(tmp_path, self.CSV)
+
+        call_command("import_questions", str(csv_file), batch_size=2)
+
+        questions = Question.objects.order_by("text")
+        assert [(q.text, q.attribute, q.connotation) for q in questions] == [
+            ("He is fast.", "speed", True),
+            ("He is honest.", "honesty", True),
+            ("He lies.", "honesty", False),
+        ]
+
+    def test_import_file_uri(self, db, tmp_path):
+        csv_file = self.write_csv(tmp_path, self.CSV)
+
+        call_command("import_questions", csv_file.as_uri())
+
+        assert Question.objects.count() == 3
+
+    def test_reimport(self, db, tmp_path, capsys):
+        csv_file = self.write_csv(tmp_path, self.CSV)
+        call_command("import_questions", str(csv_file))
+        Question.objects.filter(text="He lies.").update(attribute="other")
+
+        call_command("import_questions", str(csv_file))
+
+        assert Question.objects.count() == 3
+        assert Question.objects.get(text="He lies.").attribute == "other"
+        assert "0 created, 0 updated, 2 unchanged, 2 skipped" in capsys.readouterr().out
+
+    def test_update(self, db, tmp_path):
+        csv_file = self.write_csv(tmp_path, self.CSV)
+        call_command("import_questions", str(csv_file))
+        Question.objects.filter(text="He lies.").update(attribute="other")
+
+        call_command("import_questions", str(csv_file), update=True)
+
+        assert Question.objects.get(text="He lies.").attribute == "honesty"
+
+    def test_update_discards_results(self, survey, tmp_path):
+        csv_file = self.write_csv(tmp_path, self.CSV)
+        call_command("import_questions", str(csv_file))
+        other = Survey.objects.create(
+            employee_name="johannes",
+            employee_email="johannes@mail.com",
+            manager_email="sebastian@mail.com",
+        )
+        participant = survey.participant_set.create(email="peer@mail.com")
+        Answer.objects.create(
+            survey=survey,
+            participant=participant,
+            question=Question.objects.get(text="He lies."),
+            decision=True,
+        )
+        for stored in (survey, other):
+            ResultSnapshot.objects.create(survey=stored, data={})
+            ScoreVector.objects.create(survey=stored)
+        Question.objects.filter(text="He lies.").update(attribute="other")
+
+        call_command("import_questions", str(csv_file), update=True)
+
+        assert list(ResultSnapshot.objects.values_list("survey", flat=True)) == [
+            other.pk
+        ]
+        assert list(ScoreVector.objects.values_list("survey", flat=True)) == [other.pk]
+
+    def test_import_reconciles_progress(self, survey, tmp_path, capsys):
+        question = Question.objects.create(text="He is kind.", attribute="kindness")
+        participant = survey.participant_set.create(email="peer@mail.com")
+        Answer.objects.create(
+            survey=survey, participant=participant, question=question, decision=True
+        )
+        participant.refresh_from_db()
+        assert participant.completed_at is not None
+        csv_file = self.write_csv(tmp_path, self.CSV)
+
+        call_command("import_questions", str(csv_file))
+
+        participant.refresh_from_db()
+        assert participant.answered_count == 1
+        assert participant.completed_at is None
+        assert "Reconciled progress of 1 participants." in capsys.readouterr().out
+
+    def test_dry_run(self, db, tmp_path, capsys):
+        csv_file = self.write_csv(tmp_path, self.CSV)
+
+        call_command("import_questions", str(csv_file), dry_run=True, verbosity=2)
+
+        assert not Question.objects.exists()
+        out = capsys.readouterr().out
+        assert "+ He lies. (honesty, False)" in out
+        assert "Dry run: 3 created, 0 updated, 0 unchanged, 1 skipped." in out
+
+    @pytest.mark.parametrize(
+        "dry_run, prefix", [(True, "Dry run"), (False, "Imported questions")]
+    )
+    def test_duplicates_across_batches(self, db, tmp_path, capsys, dry_run, prefix):
+        csv_file = self.write_csv(
+            tmp_path,
+            "statement,attribute,connotation\n"
+            "He is honest.,honesty,1\n"
+            "He lies.,honesty,0\n"
+            "He is honest.,honesty,1\n",
+        )
+
+        call_command("import_questions", str(csv_file), dry_run=dry_run, batch_size=2)
+
+        out = capsys.readouterr().out
+        assert "%s: 2 created, 0 updated, 0 unchanged, 1 skipped." % prefix in out
+
+    def test_invalid_header(self, db, tmp_path):
+        csv_file = self.write_csv(tmp_path, "text,attribute\nHe is honest.,honesty\n")
+
+        with pytest.raises(CommandError, match="CSV header do not match."):
+            call_command("import_questions", str(csv_file))
+
+
+class TestBenchmark:
+    def test_baseline(self, db, tmp_path):
+        baseline = tmp_path / "benchmark.json"
+        options = dict(
+            surveys=2, participants=3, questions=4, completion=0, requests=3, warmup=1
+        )
+
+        call_command("benchmark", baseline=str(baseline), save_baseline=True, **options)
+
+        results = json.loads(baseline.read_text())
+        assert set(results) == {
+            "survey-view",
+            "survey-data",
+            "survey-data-uncached",
+            "answer-form",
+            "answer-submit",
+        }
+        assert results["survey-view"]["requests"] == 3
+        assert not Survey.objects.exists()
+
+        results["survey-data"]["queries"] = 0
+        baseline.write_text(json.dumps(results))
+        with pytest.raises(CommandError, match="survey-data: 3 queries"):
+            call_command("benchmark", baseline=str(baseline), **options)
+
+    def test_ssl_redirect(self, db, tmp_path, settings):
+        settings.SECURE_SSL_REDIRECT = True
+        baseline = tmp_path / "benchmark.json"
+
+        call_command(
+            "benchmark",
+            baseline=str(baseline),
+            save_baseline=True,
+            surveys=1,
+            participants=2,
+            questions=2,
+            requests=2,
+            warmup=0,
+        )
+
+        assert json.loads(baseline.read_text())["survey-view"]["requests"] == 2
+
+    def test_redirect(self, survey):
+        class RedirectClient:
+            def get(self, url, data, secure):
+                return HttpResponseRedirect(url)
+
+        with pytest.raises(ValueError, match="returned 302"):
+            benchmark.measure("survey-view", warmup=0, client=RedirectClient())
+
+    def test_no_data(self, db, tmp_path):
+        call_command("benchmark", no_seed=True, baseline=str(tmp_path / "missing.json"))
+
+
+class TestSeedSynthetic:
+    def get_data(self):
+        return [
+            (
+                survey.employee_name,
+                survey.is_complete,
+                [
+                    (
+                        participant.relation,
+                        [
+                            (answer.question.text, answer.decision)
+                            for answer in participant.answer_set.order_by("question")
+                        ],
+                    )
+                    for participant in survey.participant_set.order_by("email")
+                ],
+            )
+            for survey in Survey.objects.order_by("employee_name")
+        ]
+
+    @pytest.mark.parametrize("use_copy", [True, False])
+    def test_seed(self, db, use_copy):
+        if use_copy and connection.vendor != "postgresql":
+            pytest.skip("COPY requires PostgreSQL.")
+        for i in range(5):
+            Question.objects.create(text="question %d" % i, attribute="a%d" % (i % 2))
+
+        call_command("seed_synthetic", 4, 5, seed=1, batch_size=50, use_copy=use_copy)
+
+        assert Survey.objects.count() == 4
+        assert Survey.objects.filter(is_complete=True).count() == 2
+        assert Participant.objects.filter(relation="self").count() == 4
+        assert Participant.objects.count() == 20
+        participant = Participant.objects.exclude(deck_position=0).first()
+        assert participant.answer_set.count() == participant.deck_position
+        assert BenchmarkAggregate.objects.exists()
+        assert Participant.objects.reconcile(5) == []
+
+        data = self.get_data()
+        Survey.objects.all().delete()
+        call_command("seed_synthetic", 4, 5, seed=1, use_copy=False)
+        assert self.get_data() == data
+
+        Survey.objects.all().delete()
+        call_command("seed_synthetic", 4, 5, seed=2)
+        assert self.get_data() != data
+
+    def test_no_questions(self, db):
+        with pytest.raises(CommandError, match="no questions"):
+            call_command("seed_synthetic", 1, 1)
+
+
+class TestCheckQueryPlans:
+    def test_small_tables(self, survey, capsys):
+        participant = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        question = Question.objects.create(text="question", attribute="attribute")
+        Answer.objects.create(
+            survey=survey, participant=participant, question=question, decision=True
+        )
+
+        call_command("check_query_plans")
+
+        assert "survey results: ok" in capsys.readouterr().out
+
+    def test_min_rows(self, survey, capsys):
+        if connection.vendor != "postgresql":
+            pytest.skip("SQLite indexes these small tables.")
+        participant = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        question = Question.objects.create(text="question", attribute="attribute")
+        Answer.objects.create(
+            survey=survey, participant=participant, question=question, decision=True
+        )
+
+        with pytest.raises(CommandError, match="Sequential scans"):
+            call_command("check_query_plans", min_rows=1)
+
+        assert "(1 rows)" in capsys.readouterr().out
+
+    def test_no_answers(self, db):
+        with pytest.raises(CommandError, match="no answers"):
+            call_command("check_query_plans")
+
+    def test_iter_seq_scans(self):
+        plan = {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Index Scan", "Relation Name": "threesixty_answer"},
+                {
+                    "Node Type": "Hash",
+                    "Plans": [
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "threesixty_participant",
+                        }
+                    ],
+                },
+            ],
+        }
+
+        assert list(check_query_plans.iter_seq_scans(plan)) == [
+            "threesixty_participant"
+        ]
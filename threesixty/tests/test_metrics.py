@@ -0,0 +1,100 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from threesixty import metrics
+from threesixty.models import Survey
+
+
+class TestHistogram:
+    def test_samples(self):
+        histogram = metrics.Histogram("test", "Test histogram.", [1, 5], ["view"])
+        histogram.observe(0.5, "index")
+        histogram.observe(3, "index")
+        histogram.observe(10, 'say "hi"')
+
+        assert list(histogram.samples()) == [
+            "# HELP test Test histogram.",
+            "# TYPE test histogram",
+            'test_bucket{view="index",le="1"} 1',
+            'test_bucket{view="index",le="5"} 2',
+            'test_bucket{view="index",le="+Inf"} 2',
+            'test_sum{view="index"} 3.5',
+            'test_count{view="index"} 2',
+            'test_bucket{view="say \\"hi\\"",le="1"} 0',
+            'test_bucket{view="say \\"hi\\"",le="5"} 0',
+            'test_bucket{view="say \\"hi\\"",le="+Inf"} 1',
+            'test_sum{view="say \\"hi\\""} 10',
+            'test_count{view="say \\"hi\\""} 1',
+        ]
+
+
+class TestMetricsView:
+    @pytest.fixture(autouse=True)
+    def token(self, settings):
+        settings.METRICS_TOKEN = "secret"
+
+    def get_metrics(self, client):
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == 200
+        return response.content.decode()
+
+    def test_request_metrics(self, client, db):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        client.get(survey.get_employee_url())
+
+        lines = self.get_metrics(client).splitlines()
+        assert (
+            'threesixty_request_duration_seconds_count{view="survey-view",method="GET"}'
+            " 1" in lines
+        )
+        assert 'threesixty_request_sql_queries_count{view="survey-view"} 1' in lines
+        assert (
+            'threesixty_request_sql_queries_bucket{view="survey-view",le="1"} 0'
+            in lines
+        )
+        sums = dict(line.rsplit(" ", 1) for line in lines if "_sum" in line)
+        assert float(sums['threesixty_request_sql_seconds_sum{view="survey-view"}']) > 0
+        assert (
+            float(sums['threesixty_request_template_seconds_sum{view="survey-view"}'])
+            > 0
+        )
+
+    def test_async_request_metrics(self, async_client, client, db):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        participant = survey.participant_set.create(
+            email="peter@mail.com", relation="peer"
+        )
+        async_to_sync(async_client.get)(participant.get_absolute_url())
+
+        lines = self.get_metrics(client).splitlines()
+        # the queries run in the threads of the async ORM
+        assert (
+            'threesixty_request_sql_queries_bucket{view="survey-answer",le="1"} 0'
+            in lines
+        )
+
+    @pytest.mark.parametrize("authorization", [None, "Bearer wrong", "secret"])
+    def test_unauthorized(self, client, authorization):
+        headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+        assert client.get("/metrics", **headers).status_code == 404
+
+    def test_disabled(self, client, settings):
+        settings.METRICS_TOKEN = None
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer None")
+        assert response.status_code == 404
+
+    def test_slow_request_warning(self, client, settings, caplog):
+        settings.METRICS_LATENCY_THRESHOLD = 0
+        with caplog.at_level(logging.WARNING, logger="threesixty.metrics"):
+            client.get("/")
+        assert "Slow request GET / (index)" in caplog.text
@@ -0,0 +1,338 @@
+import datetime
+import smtplib
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from threesixty import catalog
+from threesixty.models import (
+    Answer,
+    BenchmarkAggregate,
+    EmailOutbox,
+    Participant,
+    Question,
+    Survey,
+    feminize,
+)
+
+
+class TestQuestion:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("He lies.", "She lies."),
+            ("I trust him and his ideas.", "I trust her and her ideas."),
+            ("He blames himself.", "She blames herself."),
+            ("HE IS THE BEST.", "SHE IS THE BEST."),
+            ("This is what he thinks.", "This is what she thinks."),
+            ("Their theme is chemistry.", "Their theme is chemistry."),
+        ],
+    )
+    def test_feminize(self, text, expected):
+        assert feminize(text) == expected
+
+    def test_get_display(self, db):
+        question = Question.objects.create(text="He likes his job.", attribute="a")
+        Question.objects.bulk_create([Question(text="Is he fair?", attribute="a")])
+        female = Survey(employee_gender="female")
+        male = Survey(employee_gender="male")
+
+        assert question.get_display(female) == "She likes her job."
+        assert question.get_display(male) == "He likes his job."
+        assert Question.objects.get(text="Is he fair?").text_female == "Is she fair?"
+        question.text = "He helps."
+        question.save(update_fields=["text"])
+        assert Question.objects.get(pk=question.pk).get_display(female) == "She helps."
+        assert catalog.get_catalog()[question.pk].get_display(female) == "She helps."
+
+
+class TestBenchmarkAggregate:
+    def create_answers(self):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        positive = Question.objects.create(
+            text="Question 1", attribute="attribute 1", connotation=True
+        )
+        negative = Question.objects.create(
+            text="Question 2", attribute="attribute 1", connotation=False
+        )
+        peer = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        me = Participant.objects.create(
+            email="sebastian@mail.com", survey=survey, relation="self"
+        )
+        Answer.objects.create(
+            survey=survey, question=positive, participant=peer, decision=True
+        )
+        Answer.objects.create(
+            survey=survey, question=negative, participant=peer, decision=True
+        )
+        Answer.objects.create(
+            survey=survey, question=positive, participant=me, decision=True
+        )
+        return survey, peer
+
+    def test_add_answer(self, db):
+        self.create_answers()
+
+        aggregate = BenchmarkAggregate.objects.get()
+        assert aggregate.attribute == "attribute 1"
+        assert aggregate.score_sum == 1
+        assert aggregate.answer_count == 2
+        assert aggregate.score == 0.5
+
+    def test_skipped_answer(self, db):
+        survey, peer = self.create_answers()
+        question = Question.objects.create(
+            text="Question 3", attribute="attribute 1", connotation=True
+        )
+        Answer.objects.create(survey=survey, question=question, participant=peer)
+
+        assert BenchmarkAggregate.objects.get().answer_count == 2
+
+    def test_delete_answer(self, db):
+        self.create_answers()
+
+        Answer.objects.filter(question__connotation=False).delete()
+
+        aggregate = BenchmarkAggregate.objects.get()
+        assert aggregate.score_sum == 1
+        assert aggregate.answer_count == 1
+
+    def test_cascade_delete(self, db):
+        survey, peer = self.create_answers()
+
+        survey.delete()
+
+        aggregate = BenchmarkAggregate.objects.get()
+        assert aggregate.score_sum == 0
+        assert aggregate.answer_count == 0
+
+    def test_delete_participant(self, db):
+        survey, peer = self.create_answers()
+
+        peer.delete()
+
+        aggregate = BenchmarkAggregate.objects.get()
+        assert aggregate.score_sum == 0
+        assert aggregate.answer_count == 0
+
+    def test_delete_question(self, db):
+        self.create_answers()
+
+        Question.objects.get(connotation=False).delete()
+
+        aggregate = BenchmarkAggregate.objects.get()
+        assert aggregate.score_sum == 1
+        assert aggregate.answer_count == 1
+
+    def test_cascade_delete_queries(self, db):
+        questions = [
+            Question.objects.create(text="Question %d" % i, attribute="a%d" % (i % 2))
+            for i in range(10)
+        ]
+
+        def create_survey(name, questions, peers):
+            survey = Survey.objects.create(
+                employee_name=name,
+                employee_email="%s@mail.com" % name,
+                manager_email="johannes@mail.com",
+            )
+            for i in range(peers):
+                participant = Participant.objects.create(
+                    email="peer%d@mail.com" % i, survey=survey, relation="peer"
+                )
+                Answer.objects.bulk_create(
+                    Answer(
+                        survey=survey,
+                        participant=participant,
+                        question=question,
+                        decision=True,
+                    )
+                    for question in questions
+                )
+            return survey
+
+        small = create_survey("small", questions[:2], 1)
+        large = create_survey("large", questions, 5)
+        BenchmarkAggregate.objects.rebuild()
+
+        with CaptureQueriesContext(connection) as small_queries:
+            small.delete()
+        with CaptureQueriesContext(connection) as large_queries:
+            large.delete()
+
+        # the answers are deleted in bulk, not one by one
+        assert len(large_queries) == len(small_queries)
+        assert set(
+            BenchmarkAggregate.objects.values_list("score_sum", "answer_count")
+        ) == {(0, 0)}
+
+    def test_rebuild(self, db):
+        self.create_answers()
+        BenchmarkAggregate.objects.update(score_sum=0, answer_count=0)
+
+        BenchmarkAggregate.objects.rebuild()
+
+        aggregate = BenchmarkAggregate.objects.get()
+        assert aggregate.score_sum == 1
+        assert aggregate.answer_count == 2
+
+
+class TestParticipantProgress:
+    def create_participant(self):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        questions = [
+            Question.objects.create(text="Question %d" % i, attribute="attribute")
+            for i in range(2)
+        ]
+        participant = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        return participant, questions
+
+    def test_answers(self, db):
+        participant, questions = self.create_participant()
+
+        Answer.objects.create(
+            survey=participant.survey, question=questions[0], participant=participant
+        )
+        participant.refresh_from_db()
+        assert participant.answered_count == 1
+        assert not participant.survey_completed
+
+        answer = Answer.objects.create(
+            survey=participant.survey, question=questions[1], participant=participant
+        )
+        assert participant.answered_count == 2
+        assert participant.survey_completed
+        participant.refresh_from_db()
+        assert participant.answered_count == 2
+        assert participant.completed_at is not None
+
+        answer.delete()
+        participant.refresh_from_db()
+        assert participant.answered_count == 1
+        assert participant.completed_at is None
+
+    def test_delete_question(self, db):
+        participant, questions = self.create_participant()
+        for question in questions:
+            Answer.objects.create(
+                survey=participant.survey, question=question, participant=participant
+            )
+
+        questions[0].delete()
+
+        participant.refresh_from_db()
+        assert participant.answered_count == 1
+        assert participant.completed_at is not None
+
+    def test_delete_answers(self, db):
+        participant, questions = self.create_participant()
+        for question in questions:
+            Answer.objects.create(
+                survey=participant.survey, question=question, participant=participant
+            )
+
+        Answer.objects.all().delete()
+
+        participant.refresh_from_db()
+        assert participant.answered_count == 0
+        assert participant.completed_at is None
+
+    def test_reconcile(self, db):
+        participant, questions = self.create_participant()
+        for question in questions:
+            Answer.objects.create(
+                survey=participant.survey, question=question, participant=participant
+            )
+        Participant.objects.update(answered_count=5, completed_at=None)
+
+        assert Participant.objects.reconcile(2) == [participant]
+
+        participant.refresh_from_db()
+        assert participant.answered_count == 2
+        assert participant.completed_at == Answer.objects.latest().created
+        assert Participant.objects.reconcile(2) == []
+        Participant.objects.reconcile(3)
+        assert Participant.objects.get().completed_at is None
+
+
+class TestEmailOutbox:
+    def queue_emails(self, count):
+        for i in range(count):
+            EmailOutbox.objects.send_mail(
+                subject="360-degree feedback",
+                message="Hello",
+                from_email="johannes@mail.com",
+                recipient_list=["peter%d@mail.com" % i],
+            )
+
+    def test_send_pending(self, db):
+        self.queue_emails(3)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open", autospec=True
+        ) as open_connection:
+            emails = EmailOutbox.objects.send_pending()
+
+        assert open_connection.call_count == 1
+        assert len(emails) == 3
+        assert len(mail.outbox) == 3
+        assert mail.outbox[0].recipients() == ["peter0@mail.com"]
+        assert not EmailOutbox.objects.filter(sent=None).exists()
+        assert not EmailOutbox.objects.send_pending()
+
+    def test_send_pending_batch_size(self, db):
+        self.queue_emails(3)
+
+        EmailOutbox.objects.send_pending(batch_size=2)
+
+        assert len(mail.outbox) == 2
+        assert EmailOutbox.objects.pending().count() == 1
+
+    def test_retry(self, db, settings):
+        settings.EMAIL_OUTBOX_BACKOFF = 60
+        self.queue_emails(1)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=smtplib.SMTPException("boom"),
+        ):
+            EmailOutbox.objects.send_pending()
+
+        email = EmailOutbox.objects.get()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert email.last_error == "boom"
+        assert email.next_attempt > timezone.now() + datetime.timedelta(seconds=50)
+        assert not EmailOutbox.objects.pending().exists()
+
+        EmailOutbox.objects.update(next_attempt=timezone.now())
+        EmailOutbox.objects.send_pending()
+
+        email.refresh_from_db()
+        assert email.sent is not None
+        assert email.attempts == 2
+        assert len(mail.outbox) == 1
+
+    def test_max_attempts(self, db, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        self.queue_emails(1)
+        EmailOutbox.objects.update(attempts=2)
+
+        assert not EmailOutbox.objects.send_pending()
+        assert not mail.outbox
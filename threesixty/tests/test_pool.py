@@ -0,0 +1,127 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+from django.db import connection
+
+from threesixty import metrics, pool
+from threesixty.pool import base
+
+
+@pytest.fixture
+def connect(db, monkeypatch):
+    if connection.vendor != "postgresql":
+        pytest.skip("The connection pool requires PostgreSQL.")
+    monkeypatch.setattr(pool, "_pools", {})
+    yield lambda: psycopg2.connect(**connection.get_connection_params())
+    pool.close_all()
+
+
+def terminate(conn):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_terminate_backend(%s)", [conn.info.backend_pid])
+
+
+class TestConnectionPool:
+    def test_reuse(self, connect):
+        connection_pool = pool.ConnectionPool("test", 2, timeout=1, check_after=10)
+
+        conn = connection_pool.checkout(connect)
+        assert connection_pool.in_use == 1
+        connection_pool.checkin(conn)
+
+        assert connection_pool.in_use == 0
+        assert connection_pool.idle == 1
+        assert connection_pool.checkout(connect) is conn
+
+    def test_timeout(self, connect):
+        connection_pool = pool.ConnectionPool("test", 1, timeout=0.01, check_after=10)
+        connection_pool.checkout(connect)
+
+        with pytest.raises(psycopg2.OperationalError, match="All 1 connections"):
+            connection_pool.checkout(connect)
+
+        assert connection_pool.waits == 1
+        assert connection_pool.timeouts == 1
+        assert connection_pool.wait_seconds >= 0.01
+        assert connection_pool.in_use == 1
+
+    def test_wait(self, connect):
+        connection_pool = pool.ConnectionPool("test", 1, timeout=5, check_after=10)
+        conn = connection_pool.checkout(connect)
+        checked_out = []
+        waiter = threading.Thread(
+            target=lambda: checked_out.append(connection_pool.checkout(connect))
+        )
+        waiter.start()
+        while not connection_pool.waits:
+            time.sleep(0.001)
+
+        connection_pool.checkin(conn)
+        waiter.join()
+
+        assert checked_out == [conn]
+        assert connection_pool.waits == 1
+        assert connection_pool.timeouts == 0
+
+    def test_rollback(self, connect):
+        connection_pool = pool.ConnectionPool("test", 1, timeout=1, check_after=10)
+        conn = connection_pool.checkout(connect)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        assert (
+            conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+
+        connection_pool.checkin(conn)
+
+        assert (
+            conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+        assert connection_pool.idle == 1
+
+    def test_discard_closed(self, connect):
+        connection_pool = pool.ConnectionPool("test", 1, timeout=1, check_after=10)
+        conn = connection_pool.checkout(connect)
+        conn.close()
+
+        connection_pool.checkin(conn)
+
+        assert connection_pool.idle == 0
+        assert connection_pool.in_use == 0
+        assert connection_pool.discarded == 1
+
+    def test_health_check(self, connect):
+        connection_pool = pool.ConnectionPool("test", 1, timeout=1, check_after=0)
+        conn = connection_pool.checkout(connect)
+        connection_pool.checkin(conn)
+        terminate(conn)
+
+        new_conn = connection_pool.checkout(connect)
+
+        assert new_conn is not conn
+        assert not new_conn.closed
+        assert connection_pool.discarded == 1
+        assert connection_pool.in_use == 1
+
+
+class TestDatabaseWrapper:
+    def test_pooled(self, connect):
+        settings_dict = {**connection.settings_dict, "POOL": {"SIZE": 1}}
+        wrapper = base.DatabaseWrapper(settings_dict, alias="pooled")
+
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn = wrapper.connection
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+        assert wrapper.connection is conn
+        assert wrapper.pool.in_use == 1
+        wrapper.close()
+        lines = metrics.render().splitlines()
+        assert 'threesixty_db_pool_size{database="pooled"} 1' in lines
+        assert 'threesixty_db_pool_in_use{database="pooled"} 0' in lines
+        assert 'threesixty_db_pool_idle{database="pooled"} 1' in lines
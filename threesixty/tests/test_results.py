@@ -0,0 +1,55 @@
+from threesixty import results
+from threesixty.models import Answer, Participant, Question, Survey
+
+
+class TestResults:
+    def test_get_results(self, db):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        other = Survey.objects.create(
+            employee_name="george",
+            employee_email="george@mail.com",
+            manager_email="johannes@mail.com",
+        )
+        kind = Question.objects.create(text="is kind", attribute="kindness")
+        rude = Question.objects.create(
+            text="is rude", attribute="kindness", connotation=False
+        )
+        late = Question.objects.create(
+            text="is late", attribute="reliability", connotation=False
+        )
+        decisions = {
+            "peer": {kind: True, rude: True, late: None},
+            "subordinate": {kind: True, rude: False, late: False},
+            "self": {kind: False, rude: False, late: True},
+        }
+        for relation, answers in decisions.items():
+            participant = Participant.objects.create(
+                email="%s@mail.com" % relation, survey=survey, relation=relation
+            )
+            for question, decision in answers.items():
+                Answer.objects.create(
+                    survey=survey,
+                    participant=participant,
+                    question=question,
+                    decision=decision,
+                )
+        participant = Participant.objects.create(
+            email="peer@mail.com", survey=other, relation="peer"
+        )
+        Answer.objects.create(
+            survey=other, participant=participant, question=kind, decision=False
+        )
+
+        assert results.get_results(survey.pk) == {
+            "peer": {"kindness": 0.5, "reliability": None},
+            "subordinate": {"kindness": 1.0, "reliability": 1.0},
+            "self": {"kindness": 0.5, "reliability": 0.0},
+            "total": {"kindness": 0.75, "reliability": 1.0},
+        }
+
+    def test_no_answers(self, db):
+        assert results.get_results(1) == {}
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from threesixty import routers
+from threesixty.models import Answer
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setitem(connections.databases, routers.REPLICA, {})
+
+
+@pytest.fixture
+def no_replica(monkeypatch):
+    monkeypatch.delitem(connections.databases, routers.REPLICA, raising=False)
+
+
+def read_alias(request):
+    with routers.analytics():
+        return HttpResponse(routers.get_read_alias())
+
+
+class TestReplicaRouter:
+    def test_without_replica(self, no_replica):
+        with routers.analytics():
+            assert routers.get_read_alias() == "default"
+
+    def test_analytics(self, replica):
+        router = routers.ReplicaRouter()
+        assert router.db_for_read(Answer) == "default"
+        with routers.analytics():
+            assert router.db_for_read(Answer) == routers.REPLICA
+            assert router.db_for_write(Answer) == "default"
+        assert router.db_for_read(Answer) == "default"
+
+    def test_migrate(self):
+        router = routers.ReplicaRouter()
+        assert router.allow_migrate("default", "threesixty")
+        assert not router.allow_migrate(routers.REPLICA, "threesixty")
+
+
+class TestReplicaMiddleware:
+    def test_read(self, replica):
+        middleware = routers.ReplicaMiddleware(read_alias)
+
+        response = middleware(RequestFactory().get("/"))
+
+        assert response.content == b"replica"
+        assert routers.STICKY_COOKIE not in response.cookies
+
+    def test_write(self, replica, settings):
+        settings.REPLICA_STICKY_SECONDS = 5
+        middleware = routers.ReplicaMiddleware(read_alias)
+
+        response = middleware(RequestFactory().post("/"))
+
+        assert response.content == b"default"
+        assert response.cookies[routers.STICKY_COOKIE]["max-age"] == 5
+
+    def test_sticky(self, replica):
+        middleware = routers.ReplicaMiddleware(read_alias)
+        request = RequestFactory().get("/")
+        request.COOKIES[routers.STICKY_COOKIE] = "1"
+
+        assert middleware(request).content == b"default"
+
+    def test_without_replica(self, no_replica):
+        middleware = routers.ReplicaMiddleware(read_alias)
+
+        response = middleware(RequestFactory().post("/"))
+
+        assert routers.STICKY_COOKIE not in response.cookies
@@ -0,0 +1,31 @@
+import pytest
+from django.core import signing
+
+from threesixty import tokens
+
+
+class TestTokens:
+    def test_roundtrip(self):
+        token = tokens.make_token(tokens.PARTICIPANT, 12, 345)
+
+        assert token.startswith("2.p.C.5Z:")
+        assert tokens.read_token(token) == tokens.Token(tokens.PARTICIPANT, 12, 345)
+
+    def test_legacy(self):
+        token = tokens.read_token(signing.TimestampSigner().sign("joe@mail.com"))
+
+        assert token.is_legacy
+        assert token.email == "joe@mail.com"
+
+    @pytest.mark.parametrize(
+        "value", ["2.p.C", "2.m.C.5Z", "2.x.C", "3.m.C", "2.m.!", "joe"]
+    )
+    def test_invalid(self, value):
+        with pytest.raises(signing.BadSignature):
+            tokens.read_token(signing.TimestampSigner().sign(value))
+
+    def test_tampered(self):
+        token = tokens.make_token(tokens.MANAGER, 1)
+
+        with pytest.raises(signing.BadSignature):
+            tokens.read_token(token.replace("2.m.1", "2.m.2"))
@@ -0,0 +1,109 @@
+import datetime
+import json
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from threesixty import archive, results, trends
+from threesixty.models import Answer, Participant, Question, ScoreVector, Survey
+
+
+@pytest.fixture
+def rounds(db):
+    kind = Question.objects.create(text="is kind", attribute="kindness")
+    late = Question.objects.create(
+        text="is late", attribute="reliability", connotation=False
+    )
+    surveys = []
+    for i, (manager, decisions) in enumerate(
+        [
+            ("johannes", {kind: False, late: True}),
+            ("johannes", {kind: True, late: None}),
+            ("george", {kind: True, late: False}),
+        ]
+    ):
+        survey = Survey.objects.create(
+            employee_name="sebastian",
+            employee_email="sebastian@mail.com",
+            manager_email="%s@mail.com" % manager,
+        )
+        participant = Participant.objects.create(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        for question, decision in decisions.items():
+            Answer.objects.create(
+                survey=survey,
+                participant=participant,
+                question=question,
+                decision=decision,
+            )
+        survey.is_complete = True
+        survey.save()
+        Survey.objects.filter(pk=survey.pk).update(
+            completed_at=timezone.now() - datetime.timedelta(days=180 * (3 - i))
+        )
+        surveys.append(survey)
+    return surveys
+
+
+def get_trend(client, survey, email):
+    url = reverse(
+        "survey-trend", kwargs={"pk": survey.pk, "token": survey.get_token(email)}
+    )
+    return client.get(url)
+
+
+class TestTrends:
+    def test_get_trend(self, rounds):
+        totals = [results.get_results(survey.pk)["total"] for survey in rounds]
+        archive.archive_survey(rounds[0])
+
+        trend = trends.get_trend(trends.get_rounds("sebastian@mail.com"))
+
+        assert trend["surveys"] == [survey.pk for survey in rounds]
+        assert trend["datasets"] == [
+            {"label": "kindness", "data": [0.0, 1.0, 1.0]},
+            {"label": "reliability", "data": [0.0, None, 1.0]},
+        ]
+        vectors = [ScoreVector.objects.get(survey=survey) for survey in rounds]
+        assert [vector.get_scores() for vector in vectors] == totals
+
+    def test_reopen(self, rounds):
+        trends.get_trend(trends.get_rounds("sebastian@mail.com"))
+        survey = rounds[1]
+        survey.is_complete = False
+        survey.save()
+
+        assert not ScoreVector.objects.filter(survey=survey).exists()
+        trend = trends.get_trend(trends.get_rounds("sebastian@mail.com"))
+        assert trend["surveys"] == [rounds[0].pk, rounds[2].pk]
+
+
+class TestSurveyTrendView:
+    def test_employee(self, rounds, client, django_assert_num_queries):
+        get_trend(client, rounds[0], "sebastian@mail.com")
+
+        # the survey of the token and all rounds with their vectors
+        with django_assert_num_queries(2):
+            response = get_trend(client, rounds[2], "sebastian@mail.com")
+
+        data = json.loads(response.content)
+        assert data["surveys"] == [survey.pk for survey in rounds]
+        assert len(data["labels"]) == 3
+
+    def test_manager(self, rounds, client):
+        response = get_trend(client, rounds[0], "johannes@mail.com")
+
+        assert json.loads(response.content)["surveys"] == [rounds[0].pk, rounds[1].pk]
+
+    def test_token_of_other_survey(self, rounds, client):
+        url = reverse(
+            "survey-trend",
+            kwargs={
+                "pk": rounds[0].pk,
+                "token": rounds[2].get_token("george@mail.com"),
+            },
+        )
+
+        assert client.get(url).status_code == 404
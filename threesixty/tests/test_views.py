@@ -1,9 +1,22 @@
 import json
 
+import pytest
+from asgiref.sync import async_to_sync
 from django.core import mail, signing
-from django.urls import reverse
-
-from threesixty.models import Answer, Participant, Question, Survey
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import resolve, reverse
+
+from threesixty import catalog, tokens
+from threesixty.models import (
+    Answer,
+    BenchmarkAggregate,
+    EmailOutbox,
+    Participant,
+    Question,
+    ResultSnapshot,
+    Survey,
+)
 
 
 class TestViews:
@@ -74,6 +87,41 @@ class TestSurveyDetailView(TestViews):
         assert response.context["object"].employee_name == "sebastian"
         assert response.context["object"].show_question_progress is True
 
+    def test_participant_progress(self, db, client, django_assert_max_num_queries):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_question()
+        question.save()
+        question1 = Question(
+            text="h0w good is hes?",
+            attribute="porfessionalitaet",
+            connotation=True,
+        )
+        question1.save()
+        participants = []
+        for i in range(5):
+            participant = Participant(
+                email="peter%d@mail.com" % i, survey=survey, relation="peer"
+            )
+            participant.save()
+            participants.append(participant)
+        self.create_answer(question, survey, participants[0]).save()
+        self.create_answer(question, survey, participants[1]).save()
+        self.create_answer(question1, survey, participants[1]).save()
+        client.get(survey.get_absolute_url())
+
+        with django_assert_max_num_queries(3):
+            response = client.get(survey.get_absolute_url())
+
+        assert response.status_code == 200
+        assert response.context["total_questions"] == 2
+        progress = [
+            (p.answered_count, p.survey_completed)
+            for p in response.context["participants"]
+        ]
+        assert progress == [(1, False), (2, True), (0, False), (0, False), (0, False)]
+        assert b"2/2" in response.content
+
 
 class TestSurveyUpdateView(TestViews):
     def test_get_update_view(self, client, db):
@@ -104,6 +152,34 @@ class TestSurveyUpdateView(TestViews):
 
         assert not Survey.objects.get().is_complete
 
+    def test_employee_token_cannot_edit(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        token = survey.get_token(survey.employee_email)
+
+        response = client.get(reverse("survey-view", args=(survey.pk, token)))
+        assert response.status_code == 200
+        response = client.get(reverse("survey-edit", args=(survey.pk, token)))
+        assert response.status_code == 404
+
+    def test_token_of_other_survey(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        other = self.create_survey()
+        other.save()
+        token = other.get_token(other.manager_email)
+
+        response = client.get(reverse("survey-edit", args=(survey.pk, token)))
+        assert response.status_code == 404
+
+    def test_legacy_token(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        token = signing.TimestampSigner().sign(survey.manager_email)
+
+        response = client.get(reverse("survey-edit", args=(survey.pk, token)))
+        assert response.status_code == 200
+
 
 class TestSurveyDataView(TestViews):
     def create_questions(self):
@@ -225,6 +301,67 @@ class TestSurveyDataView(TestViews):
         assert result_benchmark_data["attribute 2"] == 0.0
         assert result_benchmark_data["attribute 3"] == 0.75
 
+    def get_data_url(self, survey):
+        return reverse(
+            "survey-data",
+            kwargs={"pk": survey.pk, "token": survey.get_token(survey.manager_email)},
+        )
+
+    def test_data_view_conditional_get(self, db, client):
+        survey = self.create_survey_answer_test_data()
+        url = self.get_data_url(survey)
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response["ETag"]
+        assert ResultSnapshot.objects.filter(survey=survey).exists()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert response.status_code == 304
+
+    def test_data_view_async_client(self, db, async_client):
+        survey = self.create_survey_answer_test_data()
+
+        response = async_to_sync(async_client.get)(self.get_data_url(survey))
+
+        assert response.status_code == 200
+        assert json.loads(response.content)["labels"]
+
+    def test_data_view_snapshot(self, db, client):
+        survey = self.create_survey_answer_test_data()
+        url = self.get_data_url(survey)
+        data = json.loads(client.get(url).content)
+
+        Answer.objects.all().delete()
+
+        assert json.loads(client.get(url).content) == data
+
+    def test_data_view_refresh_benchmark(self, db, client):
+        survey = self.create_survey_answer_test_data()
+        url = self.get_data_url(survey)
+        etag = client.get(url)["ETag"]
+        BenchmarkAggregate.objects.update(score_sum=0)
+
+        response = client.get(url + "?refresh=benchmark", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        data = json.loads(response.content)
+        results_by_label = {result["label"]: result for result in data["datasets"]}
+        assert results_by_label["benchmark"]["data"] == [0, 0, 0]
+        assert results_by_label["total"]["data"] != [0, 0, 0]
+
+    def test_reopen_discards_snapshot(self, db, client):
+        survey = self.create_survey_answer_test_data()
+        client.get(self.get_data_url(survey))
+
+        survey.is_complete = False
+        survey.save()
+
+        assert not ResultSnapshot.objects.exists()
+
     def group_data_labels(self, labels, data_points):
         """Group labels with data.
 
@@ -236,6 +373,85 @@ class TestSurveyDataView(TestViews):
         return dict(zip(labels, data_points))
 
 
+class TestAnswerExportView(TestViews):
+    def create_survey_answer_test_data(self):
+        return TestSurveyDataView().create_survey_answer_test_data()
+
+    def get_url(self, email):
+        return reverse(
+            "answer-export", kwargs={"token": signing.TimestampSigner().sign(email)}
+        )
+
+    def test_export_csv(self, db, client):
+        survey = self.create_survey_answer_test_data()
+
+        response = client.get(self.get_url(survey.manager_email))
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == (
+            "survey,participant,relation,question,attribute,connotation,"
+            "decision,created"
+        )
+        assert len(lines) == 19
+
+    def test_export_async_client(self, db, async_client):
+        survey = self.create_survey_answer_test_data()
+
+        async def get_parts():
+            response = await async_client.get(self.get_url(survey.manager_email))
+            assert response.status_code == 200
+            # streamed as is, not read into a list first
+            assert response.is_async
+            return [part async for part in response.streaming_content]
+
+        parts = async_to_sync(get_parts)()
+
+        lines = b"".join(parts).decode().splitlines()
+        assert lines[0].startswith("survey,participant,relation")
+        assert len(lines) == 19
+
+    def test_export_ndjson_filtered(self, db, client):
+        survey = self.create_survey_answer_test_data()
+
+        response = client.get(
+            self.get_url(survey.manager_email),
+            {"format": "ndjson", "attribute": "attribute 1", "survey": survey.pk},
+        )
+
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        assert len(rows) == 6
+        assert {row["attribute"] for row in rows} == {"attribute 1"}
+        assert {row["relation"] for row in rows} == {"peer", "subordinate", "self"}
+
+    def test_export_other_manager(self, db, client):
+        survey = self.create_survey_answer_test_data()
+
+        response = client.get(
+            self.get_url(survey.manager_email), {"survey": survey.pk + 1}
+        )
+
+        assert b"".join(response.streaming_content).count(b"\n") == 1
+
+    def test_export_not_a_manager(self, db, client):
+        survey = self.create_survey_answer_test_data()
+
+        response = client.get(self.get_url(survey.employee_email))
+
+        assert response.status_code == 404
+
+    def test_export_invalid_filter(self, db, client):
+        survey = self.create_survey_answer_test_data()
+
+        response = client.get(self.get_url(survey.manager_email), {"since": "foo"})
+
+        assert response.status_code == 400
+
+
 class TestParticipantCreateView(TestViews):
     def test_get_form(self, client, db):
         survey = self.create_survey()
@@ -266,9 +482,165 @@ class TestParticipantCreateView(TestViews):
         response = client.post(url, {"email": "peter@mail.com", "relation": "peer"})
 
         assert response.status_code == 302
+        assert not mail.outbox
+        call_command("send_outbox")
         assert mail.outbox[0].recipients()[0] == "peter@mail.com"
         assert Participant.objects.get().email == "peter@mail.com"
 
+    def test_send_invite_twice(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        url = reverse(
+            "survey-invite",
+            kwargs={
+                "survey_pk": survey.pk,
+                "token": survey.get_token(survey.manager_email),
+            },
+        )
+        client.post(url, {"email": "peter@mail.com", "relation": "peer"})
+
+        response = client.post(url, {"email": "peter@mail.com", "relation": "peer"})
+
+        assert response.status_code == 200
+        assert response.context["form"].errors["email"] == [
+            "This participant has already been invited."
+        ]
+        assert Participant.objects.count() == 1
+
+    def test_token_of_other_survey(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        other = self.create_survey()
+        other.save()
+
+        url = reverse(
+            "survey-invite",
+            kwargs={
+                "survey_pk": survey.pk,
+                "token": other.get_token(other.employee_email),
+            },
+        )
+
+        assert client.get(url).status_code == 404
+        assert client.post(url, {"email": "peter@mail.com"}).status_code == 404
+
+    @pytest.mark.parametrize("url_name", ["survey-invite", "survey-invite-bulk"])
+    def test_participant_token(self, client, db, url_name):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        url = reverse(
+            url_name,
+            kwargs={"survey_pk": survey.pk, "token": participant.get_token()},
+        )
+
+        assert client.get(url).status_code == 404
+        response = client.post(
+            url,
+            {"email": "peter@mail.com", "relation": "peer", "participants": ""},
+        )
+
+        assert response.status_code == 404
+        assert Participant.objects.count() == 1
+        assert not EmailOutbox.objects.exists()
+
+
+class TestParticipantBulkCreateView(TestViews):
+    def get_url(self, survey):
+        return reverse(
+            "survey-invite-bulk",
+            kwargs={
+                "survey_pk": survey.pk,
+                "token": survey.get_token(survey.manager_email),
+            },
+        )
+
+    def test_get_form(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+
+        response = client.get(self.get_url(survey))
+
+        assert response.status_code == 200
+        assert b'enctype="multipart/form-data"' in response.content
+
+    def test_bulk_invite(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        self.create_question().save()
+        Participant(email="peter@mail.com", survey=survey, relation="peer").save()
+        csv_file = SimpleUploadedFile("participants.csv", b"paul@mail.com,supervisor\n")
+
+        response = client.post(
+            self.get_url(survey),
+            {
+                "participants": "peter@mail.com,peer\n\nmary@mail.com, subordinate\n",
+                "csv_file": csv_file,
+            },
+        )
+
+        assert response.status_code == 302
+        participants = Participant.objects.order_by("email")
+        assert [(p.email, p.relation) for p in participants] == [
+            ("mary@mail.com", "subordinate"),
+            ("paul@mail.com", "supervisor"),
+            ("peter@mail.com", "peer"),
+        ]
+        assert len(participants[0].deck) == 1
+        call_command("send_outbox")
+        assert sorted(m.recipients()[0] for m in mail.outbox) == [
+            "mary@mail.com",
+            "paul@mail.com",
+        ]
+
+    def test_bulk_invite_concurrently(self, client, db, monkeypatch):
+        survey = self.create_survey()
+        survey.save()
+        get_catalog = catalog.get_catalog
+
+        def invite_concurrently():
+            Participant(email="peter@mail.com", survey=survey, relation="peer").save()
+            return get_catalog()
+
+        monkeypatch.setattr(catalog, "get_catalog", invite_concurrently)
+        data = {"participants": "peter@mail.com,peer\nmary@mail.com,peer\n"}
+
+        response = client.post(self.get_url(survey), data)
+
+        assert response.status_code == 200
+        assert response.context["form"].errors["__all__"] == [
+            "Some participants have just been invited, please try again."
+        ]
+        assert list(Participant.objects.values_list("email", flat=True)) == [
+            "peter@mail.com"
+        ]
+        assert not EmailOutbox.objects.exists()
+
+        monkeypatch.setattr(catalog, "get_catalog", get_catalog)
+        response = client.post(self.get_url(survey), data)
+
+        assert response.status_code == 302
+        assert list(EmailOutbox.objects.values_list("recipient_list", flat=True)) == [
+            ["mary@mail.com"]
+        ]
+
+    def test_bulk_invite_invalid(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+
+        response = client.post(
+            self.get_url(survey),
+            {"participants": "peter@mail.com,peer\nmary,peer\nfoo@mail.com,boss"},
+        )
+
+        assert response.status_code == 200
+        assert response.context["form"].errors["__all__"] == [
+            "Line 2: invalid email 'mary'.",
+            "Line 3: invalid relation 'boss'.",
+        ]
+        assert not Participant.objects.exists()
+
 
 class TestSurveyCreateView(TestViews):
     def test_create_survey(self, client, db):
@@ -284,9 +656,13 @@ class TestSurveyCreateView(TestViews):
             },
         )
 
+        survey = Survey.objects.get()
         assert response.status_code == 302
-        assert "joe@mail.com" in response.url
+        match = resolve(response.url)
+        assert match.url_name == "survey-edit"
+        assert tokens.read_token(match.kwargs["token"]).grants(survey, ["m"])
 
+        call_command("send_outbox")
         assert mail.outbox[0].recipients()[0] == "joe@mail.com"
         assert mail.outbox[1].recipients()[0] == "sebastian@mail.com"
 
@@ -320,6 +696,79 @@ class TestAnswerCreateView(TestViews):
         assert response.context["answered_questions"] == 0
         assert response.context["total_questions"] == 1
 
+    def test_participant_token_queries(self, client, db, django_assert_max_num_queries):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        self.create_question().save()
+        client.get(participant.get_absolute_url())
+
+        # participant with survey and the answered questions
+        with django_assert_max_num_queries(2):
+            response = client.get(participant.get_absolute_url())
+        assert response.status_code == 200
+
+    def test_participant_token_of_other_survey(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        other = self.create_survey()
+        other.save()
+        participant = self.create_participant(other.pk)
+        participant.save()
+
+        url = reverse("survey-answer", args=(survey.pk, participant.get_token()))
+        assert client.get(url).status_code == 404
+
+    def test_legacy_participant_token(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        self.create_question().save()
+
+        token = signing.TimestampSigner().sign(participant.email)
+        url = reverse("survey-answer", args=(survey.pk, token))
+        assert client.get(url).status_code == 200
+
+    def test_answer_async_client(self, db, async_client):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        question = self.create_question()
+        question.save()
+        url = participant.get_absolute_url()
+
+        response = async_to_sync(async_client.get)(url)
+        assert response.status_code == 200
+
+        response = async_to_sync(async_client.post)(
+            url,
+            {"decision": "true", "question": question.pk, "undo": "false"},
+            headers={"accept": "application/json"},
+        )
+        assert response.status_code == 200
+        assert json.loads(response.content) == {"url": "/thanks"}
+        assert Answer.objects.get().decision is True
+
+    def test_post_invalid_question(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        self.create_question().save()
+
+        response = client.post(
+            participant.get_absolute_url(),
+            {"decision": "true", "question": 0, "undo": "false"},
+            HTTP_ACCEPT="application/json",
+        )
+
+        assert response.status_code == 400
+        assert "question" in json.loads(response.content)["errors"]
+        assert not Answer.objects.exists()
+
     def test_form_valid_skip_not_allowed_skip(self, client, db):
         survey = self.create_survey()
         survey.participant_can_skip = False
@@ -504,3 +953,293 @@ class TestAnswerCreateView(TestViews):
         assert Answer.objects.get().pk == answer.pk
         assert Answer.objects.get().question == question
         assert Answer.objects.get().decision is None
+
+    def test_question_deck(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_question()
+        question.save()
+        question1 = Question(
+            text="h0w good is hes?",
+            attribute="porfessionalitaet",
+            connotation=True,
+        )
+        question1.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        deck = list(participant.deck)
+        assert sorted(deck) == sorted([question.pk, question1.pk])
+
+        response = client.get(participant.get_absolute_url())
+
+        assert response.context["statement"] == Question.objects.get(pk=deck[0]).text
+
+        client.post(
+            participant.get_absolute_url(),
+            {"decision": 2, "question": deck[0], "undo": "false"},
+        )
+        participant.refresh_from_db()
+        assert participant.deck_position == 1
+
+        client.post(
+            participant.get_absolute_url(),
+            {"decision": "", "question": deck[1], "undo": "true"},
+        )
+        participant.refresh_from_db()
+        assert participant.deck_position == 0
+        assert not Answer.objects.exists()
+
+    def test_question_deck_new_question(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_question()
+        question.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        self.create_answer(question, survey, participant, decision=True).save()
+        participant.advance_deck([question.pk])
+
+        question1 = Question(
+            text="h0w good is hes?",
+            attribute="porfessionalitaet",
+            connotation=True,
+        )
+        question1.save()
+
+        response = client.get(participant.get_absolute_url())
+
+        assert response.context["statement"] == question1.text
+
+    def test_submit_answer_json(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_question()
+        question.save()
+        question1 = Question(
+            text="h0w good is hes?",
+            attribute="porfessionalitaet",
+            connotation=True,
+        )
+        question1.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+        first, second = participant.deck
+
+        response = client.post(
+            participant.get_absolute_url(),
+            {"decision": "true", "question": first, "undo": "false"},
+            HTTP_ACCEPT="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "question": second,
+            "statement": Question.objects.get(pk=second).text,
+            "answered_questions": 1,
+            "total_questions": 2,
+        }
+
+        response = client.post(
+            participant.get_absolute_url(),
+            {"decision": "unknown", "question": second, "undo": "true"},
+            HTTP_ACCEPT="application/json",
+        )
+
+        assert response.json()["question"] == first
+        assert response.json()["answered_questions"] == 0
+
+        client.post(
+            participant.get_absolute_url(),
+            {"decision": "false", "question": first, "undo": "false"},
+            HTTP_ACCEPT="application/json",
+        )
+        response = client.post(
+            participant.get_absolute_url(),
+            {"decision": "true", "question": second, "undo": "false"},
+            HTTP_ACCEPT="application/json",
+        )
+
+        assert response.json() == {"url": "/thanks"}
+        assert Answer.objects.count() == 2
+
+    def test_submit_answer_json_invalid(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        response = client.post(
+            participant.get_absolute_url(),
+            {"decision": "true", "question": 0, "undo": "false"},
+            HTTP_ACCEPT="application/json",
+        )
+
+        assert response.status_code == 400
+        assert "question" in response.json()["errors"]
+
+
+class TestAnswerBatchView(TestViews):
+    def create_questions(self, count):
+        questions = []
+        for i in range(count):
+            question = Question(
+                text="how good is he %d?" % i,
+                attribute="attribute %d" % (i % 2),
+                connotation=True,
+            )
+            question.save()
+            questions.append(question)
+        return questions
+
+    def post(self, client, participant, data):
+        url = reverse(
+            "survey-answer-batch",
+            kwargs={
+                "survey_pk": participant.survey_id,
+                "token": signing.TimestampSigner().sign(participant.email),
+            },
+        )
+        return client.post(url, json.dumps(data), content_type="application/json")
+
+    def test_batch(self, client, db):
+        survey = self.create_survey()
+        survey.participant_can_skip = True
+        survey.save()
+        questions = self.create_questions(4)
+        participant = Participant(
+            email="peter@mail.com", survey=survey, relation="peer"
+        )
+        participant.save()
+        deck = list(participant.deck)
+
+        response = self.post(
+            client,
+            participant,
+            {
+                "answers": [
+                    {"question": deck[0], "decision": True},
+                    {"question": deck[1], "decision": None},
+                    {"question": deck[0], "decision": False},
+                ],
+                "next": 5,
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["saved"] == 2
+        assert data["answered_questions"] == 2
+        assert data["total_questions"] == 4
+        assert [q["id"] for q in data["questions"]] == deck[2:]
+        assert Answer.objects.get(question_id=deck[0]).decision is True
+        assert Answer.objects.get(question_id=deck[1]).decision is None
+        participant.refresh_from_db()
+        assert participant.deck_position == 2
+        benchmark = {
+            b.attribute: b.answer_count for b in BenchmarkAggregate.objects.all()
+        }
+        attribute = next(q.attribute for q in questions if q.pk == deck[0])
+        assert benchmark == {attribute: 1}
+
+        response = self.post(
+            client,
+            participant,
+            {"answers": [{"question": deck[0], "decision": True}]},
+        )
+
+        assert response.json()["saved"] == 0
+        assert response.json()["questions"] == []
+        assert Answer.objects.count() == 2
+
+    def test_batch_next_null(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_questions(1)[0]
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        response = self.post(
+            client,
+            participant,
+            {"answers": [{"question": question.pk, "decision": True}], "next": None},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["saved"] == 1
+        assert response.json()["questions"] == []
+
+    def test_batch_skip_not_allowed(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_questions(1)[0]
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        response = self.post(
+            client,
+            participant,
+            {"answers": [{"question": question.pk, "decision": None}]},
+        )
+
+        assert response.status_code == 403
+        assert not Answer.objects.exists()
+
+    def test_batch_invalid(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_questions(1)[0]
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        response = self.post(
+            client,
+            participant,
+            {
+                "answers": [
+                    {"question": question.pk + 1, "decision": True},
+                    {"question": question.pk, "decision": 1},
+                    {"question": question.pk},
+                ]
+            },
+        )
+
+        assert response.status_code == 400
+        assert response.json()["errors"] == [
+            "Answer 0: invalid question.",
+            "Answer 1: invalid decision.",
+            "Answer 2: question and decision are required.",
+        ]
+        assert not Answer.objects.exists()
+
+    @pytest.mark.parametrize("answers", [5, None, "answers", {"question": 1}])
+    def test_batch_answers_not_a_list(self, client, db, answers):
+        survey = self.create_survey()
+        survey.save()
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        response = self.post(client, participant, {"answers": answers})
+
+        assert response.status_code == 400
+        assert response.json() == {"errors": ["Invalid request."]}
+
+    def test_batch_answer_not_an_object(self, client, db):
+        survey = self.create_survey()
+        survey.save()
+        question = self.create_questions(1)[0]
+        participant = self.create_participant(survey.pk)
+        participant.save()
+
+        response = self.post(
+            client,
+            participant,
+            {"answers": [{"question": question.pk, "decision": True}, 5, None]},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["errors"] == [
+            "Answer 1: must be an object.",
+            "Answer 2: must be an object.",
+        ]
+        assert not Answer.objects.exists()
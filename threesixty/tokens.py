@@ -0,0 +1,67 @@
+"""
+Signed tokens used in the URLs of surveys and participants.
+
+Tokens are signed payloads of the form ``2.<role>.<survey>[.<participant>]``
+with base62 encoded primary keys, e.g. ``2.p.C.5Z:<timestamp>:<signature>``.
+They allow resolving the survey and participant of a request by primary key.
+Tokens of the first version only contain an email address. They are still
+accepted and matched against the emails of the survey or participant.
+"""
+
+from typing import NamedTuple, Optional
+
+from django.core import signing
+
+__all__ = ("MANAGER", "EMPLOYEE", "PARTICIPANT", "Token", "make_token", "read_token")
+
+VERSION = "2"
+MANAGER = "m"
+EMPLOYEE = "e"
+PARTICIPANT = "p"
+
+
+class Token(NamedTuple):
+    role: Optional[str] = None
+    survey_pk: Optional[int] = None
+    participant_pk: Optional[int] = None
+    email: Optional[str] = None
+
+    @property
+    def is_legacy(self):
+        return self.email is not None
+
+    def grants(self, survey, roles):
+        """Return whether the token grants one of the roles for the survey."""
+        if self.is_legacy:
+            emails = {
+                MANAGER: survey.manager_email,
+                EMPLOYEE: survey.employee_email,
+            }
+            return any(self.email == emails[role] for role in roles)
+        return self.role in roles and self.survey_pk == survey.pk
+
+
+def make_token(role, survey_pk, participant_pk=None):
+    values = [VERSION, role, signing.b62_encode(survey_pk)]
+    if participant_pk is not None:
+        values.append(signing.b62_encode(participant_pk))
+    return signing.TimestampSigner().sign(".".join(values))
+
+
+def read_token(token):
+    """Return the content of a token, raise BadSignature if it is invalid."""
+    value = signing.TimestampSigner().unsign(token)
+    if "@" in value:
+        return Token(email=value)
+    try:
+        version, role, *pks = value.split(".")
+        pks = [signing.b62_decode(pk) for pk in pks]
+    except ValueError:
+        raise signing.BadSignature("Malformed token.")
+    if version != VERSION or (role, len(pks)) not in [
+        (MANAGER, 1),
+        (EMPLOYEE, 1),
+        (PARTICIPANT, 2),
+    ]:
+        raise signing.BadSignature("Unknown token.")
+    return Token(role, *pks)
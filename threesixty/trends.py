@@ -0,0 +1,58 @@
+"""
+Scores of an employee across repeated survey rounds.
+
+Every completed survey keeps its total scores by attribute as a compact
+:class:`.ScoreVector`. The vector is computed from the results once, the
+first time a trend contains the survey, and discarded if the survey is
+reopened. A trend reads all rounds with their vectors in a single query.
+"""
+
+from . import models, results
+
+__all__ = ("get_rounds", "get_vector", "get_trend")
+
+
+def get_rounds(employee_email, manager_email=None):
+    """Return the completed surveys of an employee, the oldest first."""
+    surveys = models.Survey.objects.filter(
+        employee_email=employee_email, is_complete=True
+    )
+    if manager_email is not None:
+        surveys = surveys.filter(manager_email=manager_email)
+    return surveys.select_related("scorevector").order_by("completed_at", "pk")
+
+
+def get_vector(survey):
+    """Return the score vector of a completed survey, create it if missing."""
+    try:
+        return survey.scorevector
+    except models.ScoreVector.DoesNotExist:
+        pass
+    data = results.get_results(survey.pk, archived=survey.archived_at is not None)
+    vector = models.ScoreVector(survey=survey)
+    vector.set_scores(data.get("total", {}))
+    vector, _ = models.ScoreVector.objects.get_or_create(
+        survey=survey,
+        defaults={"attributes": vector.attributes, "scores": vector.scores},
+    )
+    return vector
+
+
+def get_trend(surveys):
+    """Return the total scores of the surveys as Chart.js data by attribute."""
+    rounds = [(survey, get_vector(survey).get_scores()) for survey in surveys]
+    attributes = sorted({attribute for _, scores in rounds for attribute in scores})
+    return {
+        "labels": [
+            (survey.completed_at or survey.created).date().isoformat()
+            for survey, _ in rounds
+        ],
+        "surveys": [survey.pk for survey, _ in rounds],
+        "datasets": [
+            {
+                "label": attribute,
+                "data": [scores.get(attribute) for _, scores in rounds],
+            }
+            for attribute in attributes
+        ],
+    }
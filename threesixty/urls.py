@@ -13,19 +13,34 @@ urlpatterns = [
         name="thanks",
     ),
     path("create", views.SurveyCreateView.as_view(), name="survey-create"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
+    path("export/<token>", views.AnswerExportView.as_view(), name="answer-export"),
     path("<int:pk>/<token>/view", views.SurveyDetailView.as_view(), name="survey-view"),
     path("<int:pk>/<token>/edit", views.SurveyUpdateView.as_view(), name="survey-edit"),
     path("<int:pk>/<token>/data", views.SurveyDataView.as_view(), name="survey-data"),
+    path(
+        "<int:pk>/<token>/trend", views.SurveyTrendView.as_view(), name="survey-trend"
+    ),
     path(
         "<int:survey_pk>/<token>/invite",
         views.ParticipantCreateView.as_view(),
         name="survey-invite",
     ),
+    path(
+        "<int:survey_pk>/<token>/invite/bulk",
+        views.ParticipantBulkCreateView.as_view(),
+        name="survey-invite-bulk",
+    ),
     path(
         "<int:survey_pk>/<token>/answer",
         views.AnswerCreateView.as_view(),
         name="survey-answer",
     ),
+    path(
+        "<int:survey_pk>/<token>/answers",
+        views.AnswerBatchView.as_view(),
+        name="survey-answer-batch",
+    ),
     path(
         "<int:survey_pk>/<token>/answer/<int:question_pk>",
         views.AnswerCreateView.as_view(),
@@ -1,32 +1,49 @@
-import random
-from collections import defaultdict
-from decimal import Decimal
+import hmac
+import json
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core import signing
-from django.core.mail import send_mail
-from django.db import connection
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
 from django.http import (
     Http404,
+    HttpResponse,
     HttpResponseForbidden,
     HttpResponseRedirect,
     JsonResponse,
+    StreamingHttpResponse,
 )
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.views import generic
 
-from . import forms, models
+from . import (
+    catalog,
+    export,
+    forms,
+    invitations,
+    metrics,
+    models,
+    results,
+    routers,
+    tokens,
+    trends,
+)
 
 
 class WithEmailTokenMixin:
     def dispatch(self, request, *args, **kwargs):
         self.token = kwargs["token"]
-        signer = signing.TimestampSigner()
         try:
-            self.email = signer.unsign(self.token)
+            self.token_data = tokens.read_token(self.token)
         except signing.BadSignature:
             raise Http404
+        self.email = self.token_data.email
         return super().dispatch(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
@@ -38,7 +55,7 @@ class WithEmailTokenMixin:
 class EmployeeRequiredMixin(WithEmailTokenMixin):
     def get_object(self, queryset=None):
         obj = super().get_object(queryset=queryset)
-        if self.email not in [obj.employee_email, obj.manager_email]:
+        if not self.token_data.grants(obj, [tokens.MANAGER, tokens.EMPLOYEE]):
             raise Http404
         return obj
 
@@ -46,166 +63,327 @@ class EmployeeRequiredMixin(WithEmailTokenMixin):
 class ManagerRequiredMixin(WithEmailTokenMixin):
     def get_object(self, queryset=None):
         obj = super().get_object(queryset=queryset)
-        if self.email != obj.manager_email:
+        if not self.token_data.grants(obj, [tokens.MANAGER]):
             raise Http404
         return obj
 
 
 class SurveyViewMixin:
+    participant = None
+    #: Roles the token must grant for the survey, participants are always checked
+    #: against their own survey.
+    survey_roles = None
+
     def dispatch(self, request, *args, **kwargs):
         self.survey = self.get_survey()
         return super().dispatch(request, *args, **kwargs)
 
-    def get_survey(self):
+    def get_survey_queryset(self):
+        """Return the open survey of the request, or its participant."""
         try:
             survey_pk = self.kwargs["survey_pk"]
         except KeyError:
             raise Http404
-        return get_object_or_404(models.Survey, pk=survey_pk, is_complete=False)
+        token = getattr(self, "token_data", None)
+        if token is not None and token.role == tokens.PARTICIPANT:
+            # resolve participant and survey with a single query
+            if token.survey_pk != survey_pk:
+                raise Http404
+            if self.survey_roles and tokens.PARTICIPANT not in self.survey_roles:
+                raise Http404
+            return models.Participant.objects.select_related("survey").filter(
+                pk=token.participant_pk,
+                survey_id=survey_pk,
+                survey__is_complete=False,
+            )
+        return models.Survey.objects.filter(pk=survey_pk, is_complete=False)
+
+    def set_survey(self, obj):
+        if isinstance(obj, models.Participant):
+            self.participant = obj
+            return obj.survey
+        if self.survey_roles and not self.token_data.grants(obj, self.survey_roles):
+            raise Http404
+        return obj
+
+    def get_survey(self):
+        return self.set_survey(get_object_or_404(self.get_survey_queryset()))
+
+    def get_participant(self):
+        if self.participant is not None:
+            return self.participant
+        return get_object_or_404(
+            models.Participant, email=self.email, survey=self.survey
+        )
+
+
+class AsyncSurveyViewMixin(SurveyViewMixin):
+    """Resolve the survey with the async ORM, for views with async handlers."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.survey = await self.aget_survey()
+        # skip the synchronous lookup of SurveyViewMixin
+        return await super(SurveyViewMixin, self).dispatch(request, *args, **kwargs)
+
+    async def aget_survey(self):
+        queryset = self.get_survey_queryset()
+        try:
+            obj = await queryset.aget()
+        except queryset.model.DoesNotExist:
+            raise Http404
+        return self.set_survey(obj)
+
+    async def aget_participant(self):
+        if self.participant is not None:
+            return self.participant
+        try:
+            return await models.Participant.objects.aget(
+                email=self.email, survey=self.survey
+            )
+        except models.Participant.DoesNotExist:
+            raise Http404
+
+
+class AnalyticsMixin:
+    """Read from the replica database, see :mod:`threesixty.routers`."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+        with routers.analytics():
+            return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        with routers.analytics():
+            return await super().dispatch(request, *args, **kwargs)
+
+
+class ParticipantProgressMixin:
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        total_questions = len(catalog.get_catalog())
+        context["total_questions"] = total_questions
+        context["participants"] = self.object.participant_set.order_by("created")
+        return context
 
 
-class SurveyDetailView(EmployeeRequiredMixin, generic.DetailView):
+class SurveyDetailView(
+    EmployeeRequiredMixin, ParticipantProgressMixin, generic.DetailView
+):
     model = models.Survey
 
 
-class SurveyUpdateView(ManagerRequiredMixin, generic.UpdateView):
+class SurveyUpdateView(
+    ManagerRequiredMixin, ParticipantProgressMixin, generic.UpdateView
+):
     model = models.Survey
     fields = ["is_complete"]
     template_name_suffix = "_detail"
 
 
-class SurveyDataView(EmployeeRequiredMixin, generic.DetailView):
+class SurveyDataView(AnalyticsMixin, WithEmailTokenMixin, generic.View):
     queryset = models.Survey.objects.filter(is_complete=True)
-    survey_results = """
-        WITH results AS (
-            SELECT
-              p.relation AS relation,
-              q.attribute AS attribute,
-            CASE
-              WHEN q.connotation THEN a.decision::INT
-              ELSE 1 - a.decision::INT
-            END AS score
-            FROM threesixty_answer a
-            JOIN threesixty_survey s
-              ON s.id = a.survey_id
-            JOIN threesixty_question q
-              ON q.id = a.question_id
-            JOIN threesixty_participant p
-              ON p.id = a.participant_id
-            WHERE s.id = %s
-        ), benchmark_results AS (
-            SELECT
-              p.relation AS relation,
-              q.attribute AS attribute,
-            CASE
-              WHEN q.connotation THEN a.decision::INT
-              ELSE 1 - a.decision::INT
-            END AS score
-            FROM threesixty_answer a
-            JOIN threesixty_survey s
-              ON s.id = a.survey_id
-            JOIN threesixty_question q
-              ON q.id = a.question_id
-            JOIN threesixty_participant p
-              ON p.id = a.participant_id
-        )
-        SELECT
-          relation,
-          attribute,
-          avg(score) AS avg_score
-        FROM results
-        GROUP BY relation, attribute
-        UNION ALL
-        SELECT
-          'total' AS relation,
-          attribute,
-          avg(score) AS avg_score
-        FROM results
-        WHERE relation != 'self'
-        GROUP BY attribute
-        UNION ALL
-        SELECT
-          'benchmark' AS relation,
-          attribute,
-          avg(score) AS avg_score
-        FROM benchmark_results
-        WHERE relation != 'self'
-        GROUP BY attribute;
-    """
+    colors = results.COLORS
+
+    async def get_object(self):
+        try:
+            obj = await self.queryset.aget(pk=self.kwargs["pk"])
+        except models.Survey.DoesNotExist:
+            raise Http404
+        if not self.token_data.grants(obj, [tokens.MANAGER, tokens.EMPLOYEE]):
+            raise Http404
+        return obj
 
-    colors = {
-        "supervisor": "rgba(255, 0, 0, 0.5)",
-        "subordinate": "rgba(255, 255, 0, 0.5)",
-        "peer": "rgba(0, 0, 255, 0.5)",
-        "self": "rgba(0, 255, 255, 0.5)",
-        "total": "rgba(255, 0, 255, 0.5)",
-        "benchmark": "rgba(0, 0, 0, 0.25)",
-    }
-
-    def get_results(self):
-        with connection.cursor() as cursor:
-            cursor.execute(self.survey_results, params=[self.object.pk])
-            survey_data = cursor.fetchall()
-
-        data = defaultdict(dict)
-        for relation, attribute, value in survey_data:
-            data[relation][attribute] = value
+    async def get_results(self):
+        data = await results.aget_results(
+            self.object.pk, archived=self.object.archived_at is not None
+        )
+        data["benchmark"] = await self.get_benchmark()
         return data
 
+    async def get_benchmark(self):
+        aggregates = models.BenchmarkAggregate.objects.filter(answer_count__gt=0)
+        return {aggregate.attribute: aggregate.score async for aggregate in aggregates}
+
     def transform_to_chart_js(self, data):
-        labels = list(list(data.values())[0].keys())
-        datasets = []
-        for attr, values in data.items():
-            dataset = [values[label] for label in labels]
-            datasets.append(
-                {"label": attr, "data": dataset, "backgroundColor": self.colors[attr]}
+        return results.to_chart_js(data, self.colors)
+
+    def refresh_benchmark(self, data, benchmark):
+        for dataset in data["datasets"]:
+            if dataset["label"] == "benchmark":
+                dataset["data"] = [benchmark.get(label) for label in data["labels"]]
+        return data
+
+    async def get_snapshot(self):
+        """
+        Return the result snapshot of the survey, create it on the first call.
+
+        Answers are rejected once a survey is complete, the results can only
+        change by the benchmark. It is recalculated with ``?refresh=benchmark``.
+        The data is only loaded if the snapshot is created or refreshed.
+        """
+        snapshots = models.ResultSnapshot.objects.filter(survey=self.object)
+        if self.request.GET.get("refresh") != "benchmark":
+            snapshots = snapshots.defer("data")
+        try:
+            snapshot = await snapshots.aget()
+        except models.ResultSnapshot.DoesNotExist:
+            data = self.transform_to_chart_js(await self.get_results())
+            snapshot, _ = await models.ResultSnapshot.objects.aget_or_create(
+                survey=self.object, defaults={"data": data}
             )
-        return {"labels": labels, "datasets": datasets}
+        else:
+            if self.request.GET.get("refresh") == "benchmark":
+                snapshot.data = self.refresh_benchmark(
+                    snapshot.data, await self.get_benchmark()
+                )
+                await snapshot.asave()
+        return snapshot
+
+    async def get_data(self, snapshot):
+        if "data" in snapshot.get_deferred_fields():
+            return await models.ResultSnapshot.objects.values_list(
+                "data", flat=True
+            ).aget(pk=snapshot.pk)
+        return snapshot.data
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.get_object()
+        snapshot = await self.get_snapshot()
+        etag = quote_etag("%s-%s" % (self.object.pk, snapshot.updated.timestamp()))
+        last_modified = int(snapshot.updated.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = JsonResponse(await self.get_data(snapshot))
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class SurveyTrendView(AnalyticsMixin, EmployeeRequiredMixin, generic.DetailView):
+    """
+    Total scores by attribute of all completed rounds of the employee.
+
+    Managers only see the rounds they have managed themselves.
+    """
+
+    model = models.Survey
 
     def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        data = self.transform_to_chart_js(self.get_results())
-        return JsonResponse(
-            data,
-            json_dumps_params=dict(
-                default=lambda o: float(o) if isinstance(o, Decimal) else o
-            ),
+        survey = self.get_object()
+        manager_email = None
+        if not self.token_data.grants(survey, [tokens.EMPLOYEE]):
+            manager_email = survey.manager_email
+        surveys = trends.get_rounds(survey.employee_email, manager_email)
+        return JsonResponse(trends.get_trend(surveys))
+
+
+class AnswerExportView(AnalyticsMixin, WithEmailTokenMixin, generic.View):
+    """Stream the raw answers of all surveys of a manager."""
+
+    def get(self, request, *args, **kwargs):
+        if self.token_data.role == tokens.MANAGER:
+            survey = get_object_or_404(models.Survey, pk=self.token_data.survey_pk)
+            self.email = survey.manager_email
+        if not models.Survey.objects.filter(manager_email=self.email).exists():
+            raise Http404
+        form = forms.AnswerExportForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse(form.errors, status=400)
+        filters = form.cleaned_data
+        file_format = filters.pop("format") or "csv"
+        content_type, iter_format = export.FORMATS[file_format]
+        answers = export.get_answers(manager_email=self.email, **filters)
+        # the answers are streamed after the view has returned
+        answers = answers.using(routers.get_read_alias())
+        content = iter_format(answers)
+        if isinstance(request, ASGIRequest):
+            content = export.aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            'attachment; filename="answers.%s"' % file_format
         )
+        return response
 
 
-class ParticipantCreateView(EmployeeRequiredMixin, SurveyViewMixin, generic.CreateView):
-    model = models.Participant
-    fields = (
-        "email",
-        "relation",
-    )
+class MetricsView(generic.View):
+    """Expose request metrics, requires the ``METRICS_TOKEN`` as bearer token."""
 
-    def form_valid(self, form):
-        self.object = form.save(commit=False)
-        self.object.survey = self.survey
-        self.object.save()
-        self.send_invite()
-        return HttpResponseRedirect(self.get_success_url())
+    def get(self, request, *args, **kwargs):
+        if not settings.METRICS_TOKEN:
+            raise Http404
+        authorization = request.headers.get("Authorization", "")
+        expected = "Bearer %s" % settings.METRICS_TOKEN
+        if not hmac.compare_digest(authorization.encode(), expected.encode()):
+            raise Http404
+        return HttpResponse(
+            metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class ParticipantCreateView(WithEmailTokenMixin, AsyncSurveyViewMixin, generic.View):
+    survey_roles = (tokens.MANAGER, tokens.EMPLOYEE)
+    template_name = "threesixty/participant_form.html"
+
+    async def get(self, request, *args, **kwargs):
+        return self.render_to_response(forms.ParticipantForm())
+
+    async def post(self, request, *args, **kwargs):
+        form = forms.ParticipantForm(request.POST)
+        if form.is_valid():
+            participant = form.save(commit=False)
+            participant.survey = self.survey
+            try:
+                await sync_to_async(self.invite)(participant)
+            except IntegrityError:
+                form.add_error("email", "This participant has already been invited.")
+            else:
+                return HttpResponseRedirect(self.get_success_url())
+        return self.render_to_response(form)
+
+    def invite(self, participant):
+        """Save the participant and queue the invitation in one transaction."""
+        with transaction.atomic():
+            participant.save()
+            survey_url = self.request.build_absolute_uri(participant.get_absolute_url())
+            invitations.get_invite_email(self.survey, participant, survey_url).save()
+
+    def render_to_response(self, form):
+        context = {"view": self, "form": form, "token": self.token}
+        return TemplateResponse(self.request, self.template_name, context)
 
     def get_success_url(self):
         return reverse(
             "survey-view", kwargs={"pk": self.survey.pk, "token": self.token}
         )
 
-    def send_invite(self):
-        context = {
-            "employee_name": self.survey.employee_name,
-            "survey_url": self.request.build_absolute_uri(
-                self.object.get_absolute_url()
-            ),
-        }
-        subject = "360-degree feedback - %s" % self.survey.employee_name
-        msg = render_to_string("threesixty/invite_email.txt", context)
-        send_mail(
-            subject=subject,
-            message=msg,
-            from_email=self.survey.manager_email,
-            recipient_list=[self.object.email],
+
+class ParticipantBulkCreateView(WithEmailTokenMixin, SurveyViewMixin, generic.FormView):
+    survey_roles = (tokens.MANAGER, tokens.EMPLOYEE)
+    form_class = forms.BulkInviteForm
+    template_name = "threesixty/participant_bulk_form.html"
+
+    def form_valid(self, form):
+        try:
+            invitations.invite_participants(
+                self.survey,
+                form.cleaned_data["participants"],
+                self.request.build_absolute_uri,
+            )
+        except IntegrityError:
+            # invited concurrently, resubmitting skips the existing participants
+            form.add_error(
+                None, "Some participants have just been invited, please try again."
+            )
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def get_success_url(self):
+        return reverse(
+            "survey-view", kwargs={"pk": self.survey.pk, "token": self.token}
         )
 
 
@@ -235,7 +413,7 @@ class SurveyCreateView(generic.CreateView):
         }
         subject = "360-degree feedback - %s" % self.object.employee_name
         msg = render_to_string("threesixty/manager_email.txt", context)
-        send_mail(
+        models.EmailOutbox.objects.send_mail(
             subject=subject,
             message=msg,
             from_email=self.object.manager_email,
@@ -251,7 +429,7 @@ class SurveyCreateView(generic.CreateView):
         }
         subject = "360-degree feedback"
         msg = render_to_string("threesixty/employee_email.txt", context)
-        send_mail(
+        models.EmailOutbox.objects.send_mail(
             subject=subject,
             message=msg,
             from_email=self.object.manager_email,
@@ -259,101 +437,286 @@ class SurveyCreateView(generic.CreateView):
         )
 
 
-class AnswerCreateView(WithEmailTokenMixin, SurveyViewMixin, generic.CreateView):
-    model = models.Answer
-    form_class = forms.AnswerForm
+class QuestionDeckMixin:
+    def deal_questions(self, questions, answered, limit):
+        """
+        Return the next unanswered questions and the participant's changed fields.
+
+        The deck position of the participant is moved past answered questions,
+        the caller saves the returned fields.
+        """
+        participant = self.participant
+        deck = participant.deck
+        position = participant.deck_position
+        # skip questions answered out of order or deleted in the meantime
+        while position < len(deck) and (
+            deck[position] not in questions or deck[position] in answered
+        ):
+            position += 1
+        update_fields = []
+        if position >= len(deck):
+            # deck exhausted, deal the questions that are still unanswered
+            # e.g. questions that have been added after the invite
+            question_pks = [q.pk for q in questions if q.pk not in answered]
+            if not question_pks:
+                return [], update_fields
+            participant.shuffle_deck(question_pks)
+            update_fields = ["question_deck", "deck_position"]
+            deck = participant.deck
+            position = 0
+        elif position != participant.deck_position:
+            participant.deck_position = position
+            update_fields = ["deck_position"]
+
+        upcoming = []
+        for question_pk in deck[position:]:
+            if question_pk in questions and question_pk not in answered:
+                upcoming.append(questions[question_pk])
+                if len(upcoming) == limit:
+                    break
+        return upcoming, update_fields
+
+    def get_questions(self, limit=1):
+        """Return the next unanswered questions from the participant's deck."""
+        questions = catalog.get_catalog()
+        answered = set(
+            self.participant.answer_set.values_list("question_id", flat=True)
+        )
+        upcoming, update_fields = self.deal_questions(questions, answered, limit)
+        if update_fields:
+            self.participant.save(update_fields=update_fields)
+        return upcoming
+
+    async def aget_questions(self, limit=1):
+        questions = await catalog.aget_catalog()
+        answered = {
+            question_pk
+            async for question_pk in self.participant.answer_set.values_list(
+                "question_id", flat=True
+            )
+        }
+        upcoming, update_fields = self.deal_questions(questions, answered, limit)
+        if update_fields:
+            await self.participant.asave(update_fields=update_fields)
+        return upcoming
+
+
+class AnswerBatchView(
+    WithEmailTokenMixin, SurveyViewMixin, QuestionDeckMixin, generic.View
+):
+    """
+    Store a batch of answers of a participant.
+
+    The request body is a JSON object like::
+
+        {"answers": [{"question": 1, "decision": true}, ...], "next": 10}
+
+    A decision of ``null`` skips a question. Answers to questions that have
+    already been answered are ignored, so a batch can safely be resent.
+    The response contains the progress and the ``next`` upcoming questions.
+    """
+
+    max_questions = 50
 
     def post(self, request, *args, **kwargs):
-        self.participant = get_object_or_404(
-            models.Participant, email=self.email, survey=self.survey
+        self.participant = self.get_participant()
+        try:
+            data = json.loads(request.body)
+            items = data["answers"]
+            limit = min(int(data.get("next") or 0), self.max_questions)
+        except (ValueError, TypeError, KeyError):
+            return JsonResponse({"errors": ["Invalid request."]}, status=400)
+        if not isinstance(items, list):
+            return JsonResponse({"errors": ["Invalid request."]}, status=400)
+
+        questions = catalog.get_catalog()
+        decisions = {}
+        errors = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append("Answer %d: must be an object." % i)
+                continue
+            try:
+                question_pk, decision = item["question"], item["decision"]
+            except KeyError:
+                errors.append("Answer %d: question and decision are required." % i)
+                continue
+            if type(question_pk) is not int or question_pk not in questions:
+                errors.append("Answer %d: invalid question." % i)
+            elif decision is not None and not isinstance(decision, bool):
+                errors.append("Answer %d: invalid decision." % i)
+            else:
+                decisions.setdefault(question_pk, decision)
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
+        if None in decisions.values() and not self.survey.participant_can_skip:
+            return HttpResponseForbidden()
+
+        answered = set(
+            self.participant.answer_set.filter(question_id__in=decisions).values_list(
+                "question_id", flat=True
+            )
         )
-        return super().post(request, *args, **kwargs)
+        answers = [
+            models.Answer(
+                survey=self.survey,
+                participant=self.participant,
+                question=models.Question(**questions[question_pk]._asdict()),
+                decision=decision,
+            )
+            for question_pk, decision in decisions.items()
+            if question_pk not in answered
+        ]
+        try:
+            with transaction.atomic():
+                models.Answer.objects.bulk_create(answers)
+                models.BenchmarkAggregate.objects.add_answers(answers)
+                models.Participant.objects.add_answers(
+                    self.participant, len(answers), len(questions)
+                )
+        except IntegrityError:
+            # answered concurrently, the batch can be resent
+            return JsonResponse({"errors": ["Conflict."]}, status=409)
+        self.participant.advance_deck(decisions)
 
-    def get(self, request, *args, **kwargs):
-        self.participant = get_object_or_404(
-            models.Participant, email=self.email, survey=self.survey
+        return JsonResponse(
+            {
+                "saved": len(answers),
+                "answered_questions": self.participant.answered_count,
+                "total_questions": len(questions),
+                "questions": [
+                    {"id": question.pk, "statement": question.get_display(self.survey)}
+                    for question in (self.get_questions(limit) if limit > 0 else [])
+                ],
+            }
         )
-        question_pk = self.kwargs.get("question_pk", None)
-        if question_pk:
-            return self.get_specific_question(request, question_pk, args, kwargs)
-        else:
-            return self.get_random_question(request, args, kwargs)
 
-    def get_specific_question(self, request, question_pk, args, kwargs):
-        if self.participant.answer_set.filter(question__pk=question_pk).exists():
-            return self.redirect_survey_answer(self.survey.pk, self.token)
-        else:
-            question = get_object_or_404(models.Question, pk=question_pk)
-            self.question = question
-            return super().get(request, args, kwargs)
 
-    def get_random_question(self, request, args, kwargs):
-        try:
-            self.question = self.get_question()
-        except models.Question.DoesNotExist:
-            return HttpResponseRedirect(reverse("thanks"))
-        else:
-            return super().get(request, args, kwargs)
+class AnswerCreateView(
+    WithEmailTokenMixin, AsyncSurveyViewMixin, QuestionDeckMixin, generic.View
+):
+    template_name = "threesixty/answer_form.html"
 
-    def get_question(self):
-        answered = self.participant.answer_set.all().values_list(
-            "question_id", flat=True
+    async def get(self, request, *args, **kwargs):
+        self.participant = await self.aget_participant()
+        questions = await catalog.aget_catalog()
+        question_pk = self.kwargs.get("question_pk", None)
+        if question_pk:
+            if await self.participant.answer_set.filter(
+                question_id=question_pk
+            ).aexists():
+                return self.redirect_survey_answer(self.survey.pk, self.token)
+            try:
+                question = questions[question_pk]
+            except KeyError:
+                raise Http404
+        else:
+            try:
+                question = await self.get_question()
+            except models.Question.DoesNotExist:
+                return HttpResponseRedirect(reverse("thanks"))
+        form = forms.AnswerForm(initial={"question": question.pk}, questions=questions)
+        return TemplateResponse(
+            request, self.template_name, await self.get_context_data(form, question)
         )
-        qs = models.Question.objects.exclude(pk__in=answered)
-        count = qs.count()
+
+    async def get_question(self):
         try:
-            return qs[random.randint(0, count - 1)]  # nosec
-        except ValueError:
+            return (await self.aget_questions())[0]
+        except IndexError:
             raise models.Question.DoesNotExist("No question found.")
 
-    def get_context_data(self, **kwargs):
-        qs = models.Question.objects
-        total_questions = qs.count()
-        answered_questions = self.participant.answer_set.count()
+    async def get_context_data(self, form, question):
+        return {
+            "view": self,
+            "form": form,
+            "token": self.token,
+            "name": self.survey.employee_name,
+            "statement": question.get_display(self.survey),
+            "can_skip": self.survey.participant_can_skip,
+            "show_question_progress": self.survey.show_question_progress,
+            "answered_questions": self.participant.answered_count,
+            "total_questions": len(await catalog.aget_catalog()),
+        }
 
-        context = super().get_context_data(**kwargs)
-        context["name"] = self.survey.employee_name
-        context["statement"] = self.question.get_display(self.survey)
-        context["can_skip"] = self.survey.participant_can_skip
-        context["show_question_progress"] = self.survey.show_question_progress
-        context["answered_questions"] = answered_questions
-        context["total_questions"] = total_questions
-        return context
+    async def post(self, request, *args, **kwargs):
+        self.participant = await self.aget_participant()
+        questions = await catalog.aget_catalog()
+        form = forms.AnswerForm(request.POST, questions=questions)
+        if not form.is_valid():
+            if self.wants_json():
+                return JsonResponse({"errors": form.errors}, status=400)
+            return HttpResponseRedirect(self.request.path)
+        if form.cleaned_data["undo"]:
+            return await self.undo()
+        decision = form.cleaned_data["decision"]
+        if decision is None and not self.survey.participant_can_skip:
+            return HttpResponseForbidden()
+        try:
+            await sync_to_async(self.save_answer)(
+                questions[form.cleaned_data["question"]], decision
+            )
+        except IntegrityError:
+            # answered concurrently, e.g. by a resent request
+            pass
+        if self.wants_json():
+            return await self.next_question_response()
+        return HttpResponseRedirect(self.request.path)
+
+    def save_answer(self, question, decision):
+        with transaction.atomic():
+            answer = models.Answer.objects.create(
+                survey=self.survey,
+                participant=self.participant,
+                question=models.Question(**question._asdict()),
+                decision=decision,
+            )
+        self.participant.advance_deck([answer.question_id])
 
-    def get_initial(self):
-        initial = super().get_initial()
-        if self.request.method == "GET":
-            initial["question"] = self.question.pk
-        return initial
+    def delete_answer(self, answer):
+        answer.delete()
+        self.participant.rewind_deck(answer.question_id)
 
-    def form_valid(self, form):
-        if form.data["undo"] == "true":
-            try:
-                latest_answer = models.Answer.objects.filter(
-                    participant=self.participant
-                ).latest("created")
-                kwargs = {
-                    "survey_pk": self.survey.pk,
-                    "token": self.token,
-                    "question_pk": latest_answer.question.pk,
-                }
-                latest_answer.delete()
-                return HttpResponseRedirect(
-                    reverse("surver-answer-specific", kwargs=kwargs)
-                )
-            except models.Answer.DoesNotExist:
-                return self.redirect_survey_answer(self.survey.pk, self.token)
-        elif (
-            form.cleaned_data["decision"] is not None
-            or self.survey.participant_can_skip
-        ):
-            self.object = form.save(commit=False)
-            self.object.participant = self.participant
-            self.object.survey = self.survey
-            self.object.save()
-            return HttpResponseRedirect(self.request.path)
+    async def undo(self):
+        try:
+            latest_answer = await self.participant.answer_set.alatest("created")
+        except models.Answer.DoesNotExist:
+            if self.wants_json():
+                return await self.next_question_response()
+            return self.redirect_survey_answer(self.survey.pk, self.token)
+        await sync_to_async(self.delete_answer)(latest_answer)
+        if self.wants_json():
+            return await self.next_question_response(latest_answer.question_id)
+        kwargs = {
+            "survey_pk": self.survey.pk,
+            "token": self.token,
+            "question_pk": latest_answer.question_id,
+        }
+        return HttpResponseRedirect(reverse("surver-answer-specific", kwargs=kwargs))
+
+    def wants_json(self):
+        """Return whether the client asked for the next question as JSON."""
+        accept = self.request.headers.get("Accept", "")
+        return accept.startswith("application/json")
+
+    async def next_question_response(self, question_pk=None):
+        """Respond with the next question, instead of redirecting to it."""
+        questions = await catalog.aget_catalog()
+        if question_pk in questions:
+            question = questions[question_pk]
         else:
-            return HttpResponseForbidden()
+            try:
+                question = await self.get_question()
+            except models.Question.DoesNotExist:
+                return JsonResponse({"url": reverse("thanks")})
+        return JsonResponse(
+            {
+                "question": question.pk,
+                "statement": question.get_display(self.survey),
+                "answered_questions": self.participant.answered_count,
+                "total_questions": len(questions),
+            }
+        )
 
     def redirect_survey_answer(self, survey_pk, token):
         kwargs = {